@@ -7,24 +7,57 @@ interview history, and feedback endpoints.
 """
 
 import os
+import re
+import dataclasses
+import hashlib
+import ipaddress
+import secrets
+import socket
 import time
+import uuid
+import string
 import logging
 import atexit
+import multiprocessing
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from functools import lru_cache
+from email.utils import formatdate
 from pathlib import Path
-from flask import Flask, render_template, request, jsonify, send_from_directory, redirect, url_for, session
+from urllib.parse import urlsplit
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for, session, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from werkzeug.http import parse_etags, quote_etag
 from livekit import api
 from dotenv import load_dotenv
+import httpx
+from openai import OpenAI
 
-from document_processor import doc_processor, DocumentMetadata
-from postprocess import list_interviews, get_interview_summary, merge_by_agent_turns
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from document_processor import doc_processor, DocumentMetadata, extract_text_from_file
+from postprocess import list_interviews, interviews_signature, get_interview_summary, merge_by_agent_turns
 from conversation_cache import conversation_cache, ConversationMetadata
 from supabase_client import supabase_client
-from auth_helpers import require_auth, get_current_user, get_user_id, is_authenticated
+from auth_helpers import require_auth, get_current_user, get_user_id, is_authenticated, forget_current_user
 from worker_manager import worker_manager
+from prompts import (
+    FEEDBACKSCORES, FEEDBACKFULL, build_feedback_scores_prompt, build_post_interview_feedback_prompt,
+    build_post_interview_feedback_user_prompt, build_full_feedback_prompt, build_full_feedback_user_prompt
+)
 
-# In-memory feedback cache
-feedback_cache = {}
+# Lowercases ASCII letters and maps spaces to dashes in a single pass
+_ROOM_SLUG_TABLE = str.maketrans({
+    **{c: c.lower() for c in string.ascii_uppercase},
+    ' ': '-'
+})
 
 # Load environment variables from .env file in project root
 env_path = Path(__file__).parent / '.env'
@@ -38,14 +71,80 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Formatting a traceback walks every frame and reads source lines from disk,
+# so request handlers attach one only when DEBUG is on or LOG_TRACEBACKS=true
+LOG_TRACEBACKS = os.getenv('LOG_TRACEBACKS', 'false').lower() == 'true'
+
+
+def _log_exception(message, e):
+    """Log a handled exception; message takes the exception as its only %s."""
+    if LOG_TRACEBACKS or logger.isEnabledFor(logging.DEBUG):
+        logger.error(message, e, exc_info=True)
+    else:
+        logger.error(message + " (%s)", e, type(e).__name__)
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson.
+
+    Output matches Flask's default provider: keys are sorted when
+    sort_keys is set, and datetimes are passed through to Flask's default
+    handler so they stay RFC 822 HTTP dates rather than orjson's ISO 8601.
+    Types orjson cannot encode natively fall back to the same handler
+    (Decimal, ...). Formatting options such as indent are ignored;
+    responses are always compact.
+    """
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 # Create Flask app
 app = Flask(__name__)
+if orjson is not None:
+    app.json = ORJSONProvider(app)
+else:
+    logger.warning("[CONFIG] orjson not installed, using stdlib JSON provider")
 app.secret_key = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-prod')
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = int(os.getenv('STATIC_MAX_AGE', '604800'))
 CORS(app)  # Enable CORS for API endpoints
 
 # Register cleanup on server shutdown
 atexit.register(worker_manager.cleanup_all_workers)
 
+# Invariant API error bodies, serialized once at import: key -> (body, status)
+_STATIC_ERRORS = {
+    key: (app.json.dumps(payload), status)
+    for key, (payload, status) in {
+        'no_access_token': ({'error': 'No access token'}, 400),
+        'keys_required': ({'error': 'All API keys required'}, 400),
+        'no_file': ({'error': 'No file provided', 'message': 'Please upload a file'}, 400),
+        'no_file_selected': ({'error': 'No file selected', 'message': 'Please select a file to upload'}, 400),
+        'no_conversation': ({'error': 'No conversation provided', 'message': 'Please provide conversation data'}, 400),
+        'interview_id_required': ({'error': 'interview_id required'}, 400),
+        'invalid_interview_id': ({'error': 'Invalid interview ID'}, 400),
+        'invalid_interview_id_format': ({'error': 'Invalid interview ID format'}, 400),
+        'invalid_filename': ({'error': 'Invalid filename'}, 400),
+        'unauthorized': ({'error': 'Unauthorized'}, 403),
+        'missing_interview_id': ({'error': 'Missing interview_id', 'message': 'Please provide an interview_id'}, 400),
+        'openai_key_missing': ({'error': 'API key not configured', 'message': 'Please configure your OpenAI API key in Settings'}, 400),
+        'missing_room_name': ({'error': 'Missing room_name', 'message': 'Please provide the room name'}, 400),
+        'missing_target_stage': ({'error': 'Missing target_stage', 'message': 'Please specify which stage to skip to'}, 400),
+    }.items()
+}
+
+
+def _static_error(key):
+    """Build a response from a pre-serialized error body in _STATIC_ERRORS."""
+    body, status = _STATIC_ERRORS[key]
+    return Response(body, status=status, mimetype='application/json')
+
 # Validate required environment variables for production (BYOK keys NOT included)
 required_env_vars = [
     'SUPABASE_URL',
@@ -59,13 +158,17 @@ required_env_vars = [
 
 missing_vars = [var for var in required_env_vars if not os.getenv(var)]
 if missing_vars:
-    logger.error(f"[CONFIG] Missing required environment variables: {', '.join(missing_vars)}")
+    logger.error("[CONFIG] Missing required environment variables: %s", ', '.join(missing_vars))
     if os.getenv('FLASK_ENV') == 'production':  # Only fail in production
         raise ValueError(f"Missing required environment variables: {', '.join(missing_vars)}")
     else:
         logger.warning("[CONFIG] Missing vars detected but continuing in dev mode")
 
 logger.info("[CONFIG] All required environment variables validated")
+
+# Environment is fixed for the life of the process; read once at startup
+SUPABASE_URL = os.getenv('SUPABASE_URL')
+_SUPABASE_CONFIGURED = bool(SUPABASE_URL and os.getenv('SUPABASE_SERVICE_KEY'))
 logger.info("[CONFIG] BYOK model: LiveKit, OpenAI, and Deepgram keys loaded from user database")
 
 
@@ -76,11 +179,11 @@ def login():
     """Redirect to Supabase Google OAuth"""
     try:
         redirect_url = f"{request.host_url}auth/callback"
-        auth_url = f"{os.getenv('SUPABASE_URL')}/auth/v1/authorize?provider=google&redirect_to={redirect_url}"
-        logger.info(f"[AUTH] Redirecting to OAuth: {auth_url}")
+        auth_url = f"{SUPABASE_URL}/auth/v1/authorize?provider=google&redirect_to={redirect_url}"
+        logger.info("[AUTH] Redirecting to OAuth: %s", auth_url)
         return redirect(auth_url)
     except Exception as e:
-        logger.error(f"[AUTH] Login error: {e}")
+        logger.error("[AUTH] Login error: %s", e)
         return "Login failed", 500
 
 @app.route('/auth/callback')
@@ -93,32 +196,32 @@ def auth_callback():
     """
     try:
         # Log all incoming parameters for debugging
-        logger.info(f"[AUTH] Callback received - Query params: {dict(request.args)}")
-        logger.info(f"[AUTH] Callback received - Full URL: {request.url}")
+        logger.info("[AUTH] Callback received - Query params: %s", dict(request.args))
+        logger.info("[AUTH] Callback received - Full URL: %s", request.url)
 
         # Render a page that will extract tokens from URL fragment using JavaScript
         return render_template('auth_callback.html')
     except Exception as e:
-        logger.error(f"[AUTH] Auth callback error: {e}", exc_info=True)
+        _log_exception("[AUTH] Auth callback error: %s", e)
         return "Authentication failed", 500
 
 @app.route('/auth/session', methods=['POST'])
 def set_session():
     """Set session from tokens extracted by JavaScript"""
     try:
-        data = request.json or {}
+        data = request.get_json(silent=True) or {}
         access_token = data.get('access_token')
         refresh_token = data.get('refresh_token')
 
-        logger.info(f"[AUTH] Setting session - has access_token: {bool(access_token)}, has refresh_token: {bool(refresh_token)}")
+        logger.info("[AUTH] Setting session - has access_token: %s, has refresh_token: %s", bool(access_token), bool(refresh_token))
 
         if not access_token:
             logger.error("[AUTH] No access token provided")
-            return jsonify({'error': 'No access token'}), 400
+            return _static_error('no_access_token')
 
+        # Only the access token is read server-side; keeping the refresh token
+        # out of the signed cookie shrinks the header sent with every request
         session['access_token'] = access_token
-        if refresh_token:
-            session['refresh_token'] = refresh_token
 
         logger.info("[AUTH] User authenticated successfully")
         return jsonify({
@@ -126,12 +229,13 @@ def set_session():
             'redirect': url_for('dashboard')
         })
     except Exception as e:
-        logger.error(f"[AUTH] Set session error: {e}", exc_info=True)
+        _log_exception("[AUTH] Set session error: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/auth/logout')
 def logout():
     """Clear session and logout"""
+    forget_current_user()
     session.clear()
     logger.info("[AUTH] User logged out")
     return redirect(url_for('index'))
@@ -141,11 +245,11 @@ def auth_status():
     """Check authentication status"""
     try:
         access_token = session.get('access_token')
-        logger.info(f"[AUTH] Status check - has session token: {bool(access_token)}")
+        logger.info("[AUTH] Status check - has session token: %s", bool(access_token))
 
         user = get_current_user()
         if user:
-            logger.info(f"[AUTH] User authenticated: {user.user.email}")
+            logger.info("[AUTH] User authenticated: %s", user.user.email)
             return jsonify({
                 'authenticated': True,
                 'user': {
@@ -158,7 +262,7 @@ def auth_status():
         logger.info("[AUTH] No authenticated user found")
         return jsonify({'authenticated': False})
     except Exception as e:
-        logger.error(f"[AUTH] Auth status error: {e}", exc_info=True)
+        _log_exception("[AUTH] Auth status error: %s", e)
         return jsonify({'authenticated': False})
 
 
@@ -183,7 +287,7 @@ def get_keys_status():
 
         return jsonify({'has_keys': False})
     except Exception as e:
-        logger.error(f"[API] Failed to get keys status: {e}", exc_info=True)
+        _log_exception("[API] Failed to get keys status: %s", e)
         return jsonify({'has_keys': False})
 
 
@@ -193,7 +297,7 @@ def save_user_keys():
     """Save user's API keys (encrypted)"""
     try:
         user_id = get_user_id()
-        data = request.json or {}
+        data = request.get_json(silent=True) or {}
 
         livekit_url = data.get('livekit_url')
         livekit_api_key = data.get('livekit_api_key')
@@ -202,7 +306,7 @@ def save_user_keys():
         deepgram_key = data.get('deepgram_key')
 
         if not all([livekit_url, livekit_api_key, livekit_api_secret, openai_key, deepgram_key]):
-            return jsonify({'error': 'All API keys required'}), 400
+            return _static_error('keys_required')
 
         success = supabase_client.save_api_keys(
             user_id, livekit_url, livekit_api_key, livekit_api_secret,
@@ -210,29 +314,117 @@ def save_user_keys():
         )
 
         if success:
-            logger.info(f"[API] API keys saved for user: {user_id}")
+            logger.info("[API] API keys saved for user: %s", user_id)
             return jsonify({'success': True, 'message': 'Keys saved successfully'})
 
         return jsonify({'error': 'Failed to save keys'}), 500
 
     except Exception as e:
-        logger.error(f"[API] Failed to save keys: {e}", exc_info=True)
+        _log_exception("[API] Failed to save keys: %s", e)
         return jsonify({'error': 'Internal error'}), 500
 
 
+# Key format checks for validate_keys
+_LIVEKIT_URL_SCHEMES = ('wss://', 'ws://')
+_OPENAI_KEY_FORMAT = re.compile(r'sk-[A-Za-z0-9_\-]{20,}')
+
+# Provider probes run concurrently, so validation costs the slowest round
+# trip rather than the sum of all three
+KEY_PROBE_TIMEOUT_SECONDS = float(os.getenv('KEY_PROBE_TIMEOUT_SECONDS', '10'))
+_key_probe_http_client = httpx.Client(timeout=httpx.Timeout(KEY_PROBE_TIMEOUT_SECONDS))
+_key_probe_pool = ThreadPoolExecutor(max_workers=6, thread_name_prefix='key-probe')
+atexit.register(_key_probe_http_client.close)
+atexit.register(_key_probe_pool.shutdown, wait=False)
+
+
+def _probe_openai(openai_key):
+    """Return an error message if OpenAI rejects the key, else None."""
+    response = _key_probe_http_client.get(
+        'https://api.openai.com/v1/models',
+        headers={'Authorization': f'Bearer {openai_key}'}
+    )
+    if response.status_code in (401, 403):
+        return 'OpenAI rejected the API key'
+    response.raise_for_status()
+    return None
+
+
+def _probe_deepgram(deepgram_key):
+    """Return an error message if Deepgram rejects the key, else None."""
+    response = _key_probe_http_client.get(
+        'https://api.deepgram.com/v1/projects',
+        headers={'Authorization': f'Token {deepgram_key}'}
+    )
+    if response.status_code in (401, 403):
+        return 'Deepgram rejected the API key'
+    response.raise_for_status()
+    return None
+
+
+def _public_livekit_target(livekit_url):
+    """
+    Resolve a wss:// LiveKit URL for the server-side probe.
+
+    The URL is user supplied, so the probe must never reach internal
+    services (loopback, private, link-local, metadata endpoints).
+
+    Returns:
+        tuple: (hostname, port, path, ip) when every resolved address is
+        public, else None
+    """
+    try:
+        parts = urlsplit(livekit_url)
+        if parts.scheme != 'wss' or not parts.hostname:
+            return None
+        port = parts.port or 443
+        addresses = sorted({
+            info[4][0] for info in socket.getaddrinfo(parts.hostname, port, type=socket.SOCK_STREAM)
+        })
+        if not addresses or not all(ipaddress.ip_address(address).is_global for address in addresses):
+            return None
+    except (OSError, ValueError):
+        return None
+    return parts.hostname, port, parts.path.rstrip('/'), addresses[0]
+
+
+def _probe_livekit(target, livekit_api_key, livekit_api_secret):
+    """Return an error message if the LiveKit server rejects the credentials, else None."""
+    hostname, port, path, ip = target
+
+    token = api.AccessToken(livekit_api_key, livekit_api_secret).with_grants(
+        api.VideoGrants(room_list=True)
+    ).to_jwt()
+    # Connect to the address that was checked (no second DNS lookup), while
+    # TLS SNI and certificate verification still use the hostname
+    ip_host = f'[{ip}]' if ':' in ip else ip
+    response = _key_probe_http_client.post(
+        f"https://{ip_host}:{port}{path}/twirp/livekit.RoomService/ListRooms",
+        headers={
+            'Authorization': f'Bearer {token}',
+            'Host': hostname if port == 443 else f'{hostname}:{port}'
+        },
+        json={},
+        extensions={'sni_hostname': hostname}
+    )
+    if response.status_code in (401, 403):
+        return 'LiveKit rejected the API key or secret'
+    response.raise_for_status()
+    return None
+
+
 @app.route('/api/user/keys/validate', methods=['POST'])
 @require_auth
 def validate_keys():
-    """Test API keys validity"""
+    """Test API keys validity: format checks, then live provider probes"""
     try:
-        data = request.json or {}
+        data = request.get_json(silent=True) or {}
         livekit_url = data.get('livekit_url')
         livekit_api_key = data.get('livekit_api_key')
         livekit_api_secret = data.get('livekit_api_secret')
         openai_key = data.get('openai_key')
         deepgram_key = data.get('deepgram_key')
 
-        if not livekit_url or not (livekit_url.startswith('wss://') or livekit_url.startswith('ws://')):
+        if not livekit_url or not livekit_url.startswith(_LIVEKIT_URL_SCHEMES):
             return jsonify({'valid': False, 'message': 'Invalid LiveKit URL format'})
 
         if not livekit_api_key or len(livekit_api_key) < 5:
@@ -241,34 +433,141 @@ def validate_keys():
         if not livekit_api_secret or len(livekit_api_secret) < 10:
             return jsonify({'valid': False, 'message': 'Invalid LiveKit API Secret'})
 
-        if not openai_key or not openai_key.startswith('sk-'):
+        if not openai_key or not _OPENAI_KEY_FORMAT.fullmatch(openai_key):
             return jsonify({'valid': False, 'message': 'Invalid OpenAI key format'})
 
         if not deepgram_key or len(deepgram_key) < 10:
             return jsonify({'valid': False, 'message': 'Invalid Deepgram key format'})
 
-        return jsonify({'valid': True})
+        # Formats look right; confirm each provider accepts its credentials.
+        # LiveKit is only probed on a public wss:// host, never an internal address
+        probes = {
+            'OpenAI': _key_probe_pool.submit(_probe_openai, openai_key),
+            'Deepgram': _key_probe_pool.submit(_probe_deepgram, deepgram_key),
+        }
+        unverified = []
+        livekit_target = _public_livekit_target(livekit_url)
+        if livekit_target:
+            probes['LiveKit'] = _key_probe_pool.submit(
+                _probe_livekit, livekit_target, livekit_api_key, livekit_api_secret
+            )
+        else:
+            logger.info("[API] Skipping LiveKit key probe for non-public URL")
+            unverified.append('LiveKit')
+
+        for provider, future in probes.items():
+            try:
+                message = future.result()
+            except httpx.HTTPError as e:
+                logger.warning("[API] %s key probe failed: %s", provider, e)
+                message = f'Could not verify {provider} credentials, please try again'
+            if message:
+                return jsonify({'valid': False, 'message': message})
+
+        return jsonify({'valid': True, 'unverified': unverified})
     except Exception as e:
-        logger.error(f"[API] Key validation failed: {e}", exc_info=True)
+        _log_exception("[API] Key validation failed: %s", e)
         return jsonify({'valid': False, 'message': 'Validation error'}), 500
 
 
 # ==================== STATIC FILES ====================
 
-@app.route('/favicon.ico')
-def favicon():
-    """Serve the ICO favicon."""
-    try:
-        public_dir = os.path.join(app.root_path, 'public')
-        response = send_from_directory(public_dir, 'favicon.ico', mimetype='image/x-icon')
-        response.headers['Cache-Control'] = 'public, max-age=604800'
-        return response
-    except Exception:
-        return ('', 404)
+# The favicon URL is never versioned, but the icon only changes on deploy
+FAVICON_CACHE_CONTROL = os.getenv('FAVICON_CACHE_CONTROL', 'public, max-age=31536000, immutable')
+
+# Served only by FastPathMiddleware below; a missing file falls through to a 404
+_FAVICON_PATH = os.path.join(app.root_path, 'public', 'favicon.ico')
+
+
+class FastPathMiddleware:
+    """
+    WSGI middleware answering fixed, stateless URLs before Flask dispatch.
+
+    Handles GET /favicon.ico from preloaded bytes (with ETag and
+    Last-Modified revalidation) and HEAD /health liveness probes;
+    everything else goes to Flask.
+    """
+
+    def __init__(self, wsgi_app, favicon_path):
+        self.wsgi_app = wsgi_app
+        self.favicon_bytes = None
+        self.favicon_etag = None
+        self.favicon_last_modified = None
+        self.favicon_headers = None
+        self.favicon_not_modified_headers = None
+        try:
+            with open(favicon_path, 'rb') as f:
+                self.favicon_bytes = f.read()
+            # Content-based ETag stays stable across redeploys that touch mtime
+            self.favicon_etag = hashlib.md5(self.favicon_bytes, usedforsecurity=False).hexdigest()
+            self.favicon_last_modified = formatdate(os.path.getmtime(favicon_path), usegmt=True)
+            validators = [
+                ('Cache-Control', FAVICON_CACHE_CONTROL),
+                ('ETag', quote_etag(self.favicon_etag)),
+                ('Last-Modified', self.favicon_last_modified),
+            ]
+            self.favicon_not_modified_headers = validators
+            self.favicon_headers = [
+                ('Content-Type', 'image/x-icon'),
+                ('Content-Length', str(len(self.favicon_bytes))),
+                *validators,
+            ]
+        except OSError as e:
+            logger.warning("[STATIC] Favicon fast path disabled: %s", e)
+
+    def _favicon_not_modified(self, environ):
+        """True when the client's cached copy is still current."""
+        if_none_match = environ.get('HTTP_IF_NONE_MATCH')
+        if if_none_match is not None:
+            # Weak tags, lists and '*' all count, as with Flask's conditional responses
+            return parse_etags(if_none_match).contains_weak(self.favicon_etag)
+        return environ.get('HTTP_IF_MODIFIED_SINCE') == self.favicon_last_modified
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO')
+        method = environ.get('REQUEST_METHOD')
+
+        if path == '/favicon.ico' and self.favicon_bytes is not None and method in ('GET', 'HEAD'):
+            if self._favicon_not_modified(environ):
+                start_response('304 Not Modified', self.favicon_not_modified_headers)
+                return [b'']
+            start_response('200 OK', self.favicon_headers)
+            return [b''] if method == 'HEAD' else [self.favicon_bytes]
+
+        if path == '/health' and method == 'HEAD':
+            start_response('200 OK', [('Content-Length', '0')])
+            return [b'']
+
+        return self.wsgi_app(environ, start_response)
+
+
+app.wsgi_app = FastPathMiddleware(app.wsgi_app, _FAVICON_PATH)
 
 
 # ==================== PAGE ROUTES ====================
 
+# Pages rendered identically for every visitor (per-user data is fetched by
+# their scripts) may be cached by browsers and proxies; protected pages not
+PUBLIC_PAGE_CACHE_CONTROL = os.getenv('PUBLIC_PAGE_CACHE_CONTROL', 'public, max-age=300')
+_PAGE_CACHE_CONTROL = {
+    'index': PUBLIC_PAGE_CACHE_CONTROL,
+    'start_form': PUBLIC_PAGE_CACHE_CONTROL,
+    'past_calls': PUBLIC_PAGE_CACHE_CONTROL,
+    'past_calls_alias': PUBLIC_PAGE_CACHE_CONTROL,
+    'dashboard': 'private, no-store',
+    'api_keys_page': 'private, no-store',
+}
+
+
+@app.after_request
+def set_page_cache_control(response):
+    """Apply the per-page Cache-Control policy to successful page renders."""
+    cache_control = _PAGE_CACHE_CONTROL.get(request.endpoint)
+    if cache_control and response.status_code == 200:
+        response.headers['Cache-Control'] = cache_control
+    return response
+
+
 @app.route('/')
 def index():
     """Landing page."""
@@ -308,8 +607,8 @@ def interview():
     level = request.args.get('level', '')
 
     logger.info(
-        f"[ROUTE] /interview - Interview room accessed by {name} "
-        f"(role: {role}, level: {level})"
+        "[ROUTE] /interview - Interview room accessed by %s (role: %s, level: %s)",
+        name, role, level
     )
 
     return render_template(
@@ -345,12 +644,24 @@ def history_redirect():
 @app.route('/feedback/<filename>')
 def feedback_page(filename):
     """Feedback page for a specific interview."""
-    logger.info(f"[ROUTE] /feedback/{filename} - Feedback page accessed")
+    logger.info("[ROUTE] /feedback/%s - Feedback page accessed", filename)
     return render_template('feedback.html', filename=filename)
 
 
 # ==================== TOKEN API ====================
 
+# Document text attached to participant attributes is capped to keep tokens small
+TOKEN_RESUME_MAX_CHARS = int(os.getenv('TOKEN_RESUME_MAX_CHARS', '3000'))
+TOKEN_JD_MAX_CHARS = int(os.getenv('TOKEN_JD_MAX_CHARS', '2000'))
+
+# Candidate grants are identical apart from the room, which is filled in per
+# request on a derived copy so the shared template is never mutated
+_CANDIDATE_GRANTS = api.VideoGrants(
+    room_join=True,
+    can_publish=True,
+    can_subscribe=True,
+)
+
 @app.route('/api/token', methods=['POST'])
 @require_auth
 def generate_token():
@@ -366,7 +677,7 @@ def generate_token():
     """
     try:
         user_id = get_user_id()
-        data = request.json or {}
+        data = request.get_json(silent=True) or {}
 
         name = data.get('name', 'Anonymous')
         email = data.get('email', '')
@@ -376,13 +687,13 @@ def generate_token():
         job_description = data.get('jobDescription', '')
         include_profile = data.get('includeProfile', True)
 
-        logger.info(f"[TOKEN] Token request from user {user_id} ({name})")
+        logger.info("[TOKEN] Token request from user %s (%s)", user_id, name)
 
         # Get user's API keys from database
         keys = supabase_client.get_api_keys(user_id)
 
         if not keys:
-            logger.error(f"[TOKEN] No API keys found for user: {user_id}")
+            logger.error("[TOKEN] No API keys found for user: %s", user_id)
             return jsonify({
                 'error': 'API keys not configured',
                 'message': 'Please configure your API keys in Settings before starting an interview.'
@@ -393,17 +704,18 @@ def generate_token():
         missing_keys = [k for k in required_keys if not keys.get(k)]
 
         if missing_keys:
-            logger.error(f"[TOKEN] Missing keys for user {user_id}: {missing_keys}")
+            logger.error("[TOKEN] Missing keys for user %s: %s", user_id, missing_keys)
             return jsonify({
                 'error': 'Incomplete API keys',
                 'message': f'Missing keys: {", ".join(missing_keys)}'
             }), 400
 
-        # Create unique room name
-        timestamp = int(time.time())
-        room_name = f"interview-{name.lower().replace(' ', '-')}-{timestamp}"
+        # Create unique room name; the random suffix keeps same-name starts
+        # within one second from colliding on a single room
+        timestamp = time.time_ns() // 1_000_000_000
+        room_name = f"interview-{name.translate(_ROOM_SLUG_TABLE)}-{timestamp}-{secrets.token_hex(3)}"
 
-        logger.info(f"[TOKEN] Spawning worker for room: {room_name}")
+        logger.info("[TOKEN] Spawning worker for room: %s", room_name)
 
         # Spawn agent worker subprocess with user's API keys
         worker_started = worker_manager.spawn_worker(
@@ -416,13 +728,13 @@ def generate_token():
         )
 
         if not worker_started:
-            logger.error(f"[TOKEN] Worker failed to start for room: {room_name}")
+            logger.error("[TOKEN] Worker failed to start for room: %s", room_name)
             return jsonify({
                 'error': 'Worker startup failed',
                 'message': 'Failed to start interview agent. Please try again.'
             }), 500
 
-        logger.info(f"[TOKEN] Worker ready for room: {room_name}")
+        logger.info("[TOKEN] Worker ready for room: %s", room_name)
 
         # Build participant attributes (without API keys - already in worker)
         attributes = {
@@ -435,15 +747,17 @@ def generate_token():
 
         # Add resume text if cached
         if resume_cache_key:
-            resume_text = doc_processor.get_cached_text(resume_cache_key)
+            resume_text, resume_length = doc_processor.get_cached_text_prefix(
+                resume_cache_key, TOKEN_RESUME_MAX_CHARS
+            )
             if resume_text:
-                attributes['resume_text'] = resume_text[:3000]
-                logger.info(f"[TOKEN] Attached resume text ({len(resume_text)} chars)")
+                attributes['resume_text'] = resume_text
+                logger.info("[TOKEN] Attached resume text (%d chars)", resume_length)
 
         # Add job description if provided
         if job_description:
-            attributes['job_description'] = job_description[:2000]
-            logger.info(f"[TOKEN] Attached job description ({len(job_description)} chars)")
+            attributes['job_description'] = job_description[:TOKEN_JD_MAX_CHARS]
+            logger.info("[TOKEN] Attached job description (%d chars)", len(job_description))
 
         # Create LiveKit access token using USER'S keys
         token = api.AccessToken(
@@ -451,19 +765,14 @@ def generate_token():
             keys['livekit_api_secret']
         )
 
-        token.with_identity(name).with_name(name).with_grants(
-            api.VideoGrants(
-                room_join=True,
-                room=room_name,
-                can_publish=True,
-                can_subscribe=True,
-            )
-        ).with_attributes(attributes)
+        grants = dataclasses.replace(_CANDIDATE_GRANTS, room=room_name)
+
+        token.with_identity(name).with_name(name).with_grants(grants).with_attributes(attributes)
 
         # Generate JWT
         jwt_token = token.to_jwt()
 
-        logger.info(f"[TOKEN] Token generated successfully for room: {room_name}")
+        logger.info("[TOKEN] Token generated successfully for room: %s", room_name)
 
         return jsonify({
             'token': jwt_token,
@@ -478,7 +787,7 @@ def generate_token():
         })
 
     except Exception as e:
-        logger.error(f"[TOKEN] Token generation error: {e}", exc_info=True)
+        _log_exception("[TOKEN] Token generation error: %s", e)
         return jsonify({
             'error': 'Token generation failed',
             'message': str(e)
@@ -498,16 +807,148 @@ def worker_status(room_name):
         })
 
     except Exception as e:
-        logger.error(f"[WORKER] Status check error: {e}")
+        logger.error("[WORKER] Status check error: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
 # ==================== DOCUMENT UPLOAD API ====================
 
+# Text extraction (PDF/DOCX parsing) is CPU-bound, so it runs in a process
+# pool instead of blocking the request thread
+EXTRACTION_WORKERS = int(os.getenv('EXTRACTION_WORKERS', str(os.cpu_count() or 2)))
+UPLOAD_JOB_TTL_SECONDS = int(os.getenv('UPLOAD_JOB_TTL_SECONDS', '600'))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Workers must not be forked from this multi-threaded process (locks held by
+# other request threads would be copied into the child), so start them from
+# a clean forkserver where available
+_EXTRACTION_MP_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+
+
+def _new_extraction_pool():
+    """Create the document extraction process pool."""
+    return ProcessPoolExecutor(max_workers=EXTRACTION_WORKERS, mp_context=_EXTRACTION_MP_CONTEXT)
+
+
+_extraction_pool = _new_extraction_pool()
+_extraction_pool_lock = threading.Lock()
+
+
+def _submit_extraction(tmp_path):
+    """
+    Queue text extraction for a spooled upload.
+
+    A child that crashes or is OOM-killed (e.g. on a huge PDF) leaves the
+    pool permanently broken, so on BrokenProcessPool the pool is rebuilt
+    once and the job resubmitted.
+    """
+    global _extraction_pool
+    pool = _extraction_pool
+    try:
+        return pool.submit(extract_text_from_file, tmp_path)
+    except BrokenProcessPool:
+        with _extraction_pool_lock:
+            # Another request may already have replaced it
+            if _extraction_pool is pool:
+                logger.warning("[API] Extraction pool broken; starting a new one")
+                pool.shutdown(wait=False)
+                _extraction_pool = _new_extraction_pool()
+            pool = _extraction_pool
+        return pool.submit(extract_text_from_file, tmp_path)
+
+
+@atexit.register
+def _shutdown_extraction_pool():
+    """Stop whichever extraction pool is current at exit."""
+    _extraction_pool.shutdown(wait=False)
+
+
+# Upload job state keyed by job_id: status is 'processing', 'ready' or 'failed'
+_upload_jobs = {}
+
+
+def _prune_upload_jobs():
+    """Drop finished upload jobs older than UPLOAD_JOB_TTL_SECONDS."""
+    cutoff = time.time() - UPLOAD_JOB_TTL_SECONDS
+    for job_id, job in list(_upload_jobs.items()):
+        if job['status'] != 'processing' and job['created_at'] < cutoff:
+            _upload_jobs.pop(job_id, None)
+
+
+def _upload_result(cache_key, job):
+    """Build the upload response payload for a cached document."""
+    extracted_text = doc_processor.get_cached_text(cache_key)
+    return {
+        'success': True,
+        'cache_key': cache_key,
+        'filename': job['filename'],
+        'document_type': job['document_type'],
+        'char_count': len(extracted_text),
+        'text_preview': extracted_text[:500] + ('...' if len(extracted_text) > 500 else ''),
+        'include_profile': job['include_profile']
+    }
+
+
+def _finish_upload_job(job_id, tmp_path, future):
+    """Extraction callback: cache the extracted text and record the job result."""
+    job = _upload_jobs.get(job_id)
+    try:
+        extracted_text = future.result()
+
+        if job is None:
+            return
+
+        if not extracted_text or extracted_text.startswith('['):
+            # Extraction failed or returned error message
+            job['status'] = 'failed'
+            job['result'] = {
+                'error': 'Extraction failed',
+                'message': extracted_text or 'Could not extract text from file'
+            }
+            return
+
+        metadata = DocumentMetadata(
+            filename=job['filename'],
+            document_type=job['document_type'],
+            uploaded_at=job['created_at'],
+            file_size=job['file_size'],
+            extraction_method='auto',
+            char_count=len(extracted_text)
+        )
+
+        # Cache the extracted text (NOT the file)
+        cache_key = doc_processor.cache_document(
+            extracted_text, metadata, content_hash=job['content_hash']
+        )
+
+        logger.info(
+            "[API] Document cached: %s (%d chars from %s)",
+            cache_key, len(extracted_text), job['filename']
+        )
+
+        job['result'] = _upload_result(cache_key, job)
+        job['status'] = 'ready'
+
+    except Exception as e:
+        logger.error("[API] Extraction job %s error: %s", job_id, e, exc_info=True)
+        if job is not None:
+            job['status'] = 'failed'
+            job['result'] = {
+                'error': 'Upload failed',
+                'message': str(e)
+            }
+    finally:
+        try:
+            os.remove(tmp_path)
+        except OSError as e:
+            logger.warning("[API] Could not remove temp upload %s: %s", tmp_path, e)
+
+
 @app.route('/api/upload-resume', methods=['POST'])
 def upload_resume():
     """
-    Upload and extract text from resume/portfolio/job description.
+    Upload a resume/portfolio/job description and queue text extraction.
     
     Accepts multipart form with:
         - file: The document file (PDF, DOCX, MD, TXT)
@@ -515,25 +956,19 @@ def upload_resume():
         - include_profile: boolean (optional, default true)
     
     Returns:
-        - cache_key: Key to retrieve cached text
-        - text_preview: First 500 chars of extracted text
-        - char_count: Total character count
+        - job_id: Key to poll /api/upload-resume/<job_id>/status with
+        - status: 'processing', or 'ready' with cache_key, char_count and
+          text_preview when an identical file was already extracted
     """
     try:
         # Check for file
         if 'file' not in request.files:
-            return jsonify({
-                'error': 'No file provided',
-                'message': 'Please upload a file'
-            }), 400
+            return _static_error('no_file')
             
         file = request.files['file']
         
         if not file.filename:
-            return jsonify({
-                'error': 'No file selected',
-                'message': 'Please select a file to upload'
-            }), 400
+            return _static_error('no_file_selected')
             
         # Get document type
         document_type = request.form.get('document_type', 'resume')
@@ -543,60 +978,108 @@ def upload_resume():
         include_profile = request.form.get('include_profile', 'true').lower() == 'true'
         
         logger.info(
-            f"[API] Upload request: {file.filename} "
-            f"(type: {document_type}, include_profile: {include_profile})"
+            "[API] Upload request: %s (type: %s, include_profile: %s)",
+            file.filename, document_type, include_profile
         )
         
-        # Extract text
-        extracted_text = doc_processor.extract_text(file, filename=file.filename)
+        # Spool to a temp file keeping the extension so the extractor can route it
+        suffix = Path(file.filename).suffix.lower()
+        fd, tmp_path = tempfile.mkstemp(suffix=suffix, prefix='mockflow_upload_')
+        # Size and content hash are computed in the same pass as the copy
+        hasher = hashlib.blake2b(digest_size=16)
+        file_size = 0
+        with os.fdopen(fd, 'wb') as tmp_file:
+            for chunk in iter(lambda: file.stream.read(UPLOAD_CHUNK_SIZE), b''):
+                hasher.update(chunk)
+                file_size += len(chunk)
+                tmp_file.write(chunk)
+        content_hash = hasher.hexdigest()
         
-        if not extracted_text or extracted_text.startswith('['):
-            # Extraction failed or returned error message
-            return jsonify({
-                'error': 'Extraction failed',
-                'message': extracted_text or 'Could not extract text from file'
-            }), 400
-            
-        # Create metadata
-        file.seek(0, 2)  # Seek to end
-        file_size = file.tell()
-        file.seek(0)  # Reset
+        _prune_upload_jobs()
+        job_id = uuid.uuid4().hex
+        job = {
+            'status': 'processing',
+            'filename': file.filename,
+            'document_type': document_type,
+            'include_profile': include_profile,
+            'file_size': file_size,
+            'content_hash': content_hash,
+            'created_at': time.time(),
+            'result': None
+        }
         
-        metadata = DocumentMetadata(
-            filename=file.filename,
-            document_type=document_type,
-            uploaded_at=time.time(),
-            file_size=file_size,
-            extraction_method='auto',
-            char_count=len(extracted_text)
-        )
+        # Identical file already extracted: skip the extraction pool entirely
+        existing_key = doc_processor.find_by_content_hash(content_hash)
+        if existing_key:
+            os.remove(tmp_path)
+            job['result'] = _upload_result(existing_key, job)
+            job['status'] = 'ready'
+            _upload_jobs[job_id] = job
+            logger.info("[API] Upload matches cached document: %s (%s)", existing_key, file.filename)
+            return jsonify({'job_id': job_id, 'status': 'ready', **job['result']})
         
-        # Cache the extracted text (NOT the file)
-        cache_key = doc_processor.cache_document(extracted_text, metadata)
+        _upload_jobs[job_id] = job
         
-        logger.info(
-            f"[API] Document cached: {cache_key} "
-            f"({len(extracted_text)} chars from {file.filename})"
+        try:
+            future = _submit_extraction(tmp_path)
+        except Exception:
+            # Never queued: don't leave a job stuck in 'processing'
+            _upload_jobs.pop(job_id, None)
+            os.remove(tmp_path)
+            raise
+        future.add_done_callback(
+            lambda fut: _finish_upload_job(job_id, tmp_path, fut)
         )
         
+        logger.info("[API] Extraction queued: %s (%s)", job_id, file.filename)
+        
         return jsonify({
             'success': True,
-            'cache_key': cache_key,
+            'job_id': job_id,
+            'status': 'processing',
             'filename': file.filename,
-            'document_type': document_type,
-            'char_count': len(extracted_text),
-            'text_preview': extracted_text[:500] + ('...' if len(extracted_text) > 500 else ''),
-            'include_profile': include_profile
-        })
+            'document_type': document_type
+        }), 202
         
     except Exception as e:
-        logger.error(f"[API] Upload error: {e}", exc_info=True)
+        _log_exception("[API] Upload error: %s", e)
         return jsonify({
             'error': 'Upload failed',
             'message': str(e)
         }), 500
 
 
+@app.route('/api/upload-resume/<job_id>/status')
+def upload_resume_status(job_id):
+    """
+    Poll the status of a queued document extraction.
+    
+    Returns:
+        - status: 'processing' | 'ready' | 'failed'
+        - When ready: cache_key, char_count, text_preview, ...
+        - When failed: error, message
+    """
+    job = _upload_jobs.get(job_id)
+    
+    if job is None:
+        return jsonify({
+            'error': 'Upload not found',
+            'message': f'No upload job found with id: {job_id}'
+        }), 404
+    
+    if job['status'] == 'processing':
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status': 'processing'
+        }), 202
+    
+    if job['status'] == 'failed':
+        return jsonify({'status': 'failed', 'job_id': job_id, **job['result']}), 400
+    
+    return jsonify({'status': 'ready', 'job_id': job_id, **job['result']})
+
+
 # ==================== CONVERSATION CACHE API ====================
 
 @app.route('/api/conversation/cache', methods=['POST'])
@@ -620,17 +1103,13 @@ def cache_conversation():
         - cache_key: Key to retrieve conversation
     """
     try:
-        data = request.json or {}
+        data = request.get_json(silent=True) or {}
         
         conversation = data.get('conversation', {})
         if not conversation:
-            return jsonify({
-                'error': 'No conversation provided',
-                'message': 'Please provide conversation data'
-            }), 400
+            return _static_error('no_conversation')
         
         # Create metadata
-        from datetime import datetime
         metadata = ConversationMetadata(
             candidate_name=data.get('candidate_name', 'Unknown'),
             interview_date=datetime.now().isoformat(),
@@ -653,7 +1132,7 @@ def cache_conversation():
                 'message': 'Failed to cache conversation'
             }), 500
         
-        logger.info(f"[API] Conversation cached: {cache_key}")
+        logger.info("[API] Conversation cached: %s", cache_key)
         
         return jsonify({
             'success': True,
@@ -662,7 +1141,7 @@ def cache_conversation():
         })
         
     except Exception as e:
-        logger.error(f"[API] Cache conversation error: {e}", exc_info=True)
+        _log_exception("[API] Cache conversation error: %s", e)
         return jsonify({
             'error': 'Cache failed',
             'message': str(e)
@@ -687,7 +1166,7 @@ def get_cached_conversation(cache_key):
         })
         
     except Exception as e:
-        logger.error(f"[API] Get conversation error: {e}", exc_info=True)
+        _log_exception("[API] Get conversation error: %s", e)
         return jsonify({
             'error': 'Failed to get conversation',
             'message': str(e)
@@ -696,23 +1175,51 @@ def get_cached_conversation(cache_key):
 
 # ==================== INTERVIEW HISTORY API ====================
 
+# (signature, body, etag) of the serialized /api/interviews payload, reused
+# until an interview file or the conversation cache changes. Replaced as one
+# tuple so concurrent requests never pair a body with another body's ETag
+_interviews_listing = (None, None, None)
+
+# Interview JSON may change between polls, so browsers must revalidate every
+# time; unchanged data is answered with a bodyless 304 via the ETag
+INTERVIEW_CACHE_CONTROL = 'private, no-cache'
+
+
+def _interviews_signature():
+    """Change marker: per-file (name, mtime_ns, size) plus conversation cache version."""
+    return (interviews_signature(), conversation_cache.version)
+
+
 @app.route('/api/interviews')
 def get_interviews():
     """
     List all saved interview files.
 
     Returns list of interview metadata from both cache and files.
+    The serialized listing is cached and only rebuilt when an interview
+    file is added, removed or rewritten, or the conversation cache is modified.
     """
+    global _interviews_listing
     try:
-        interviews = list_interviews()
-        logger.info(f"[API] Listed {len(interviews)} interviews")
-        return jsonify({
-            'success': True,
-            'interviews': interviews,
-            'count': len(interviews)
-        })
+        signature = _interviews_signature()
+        cached_signature, body, etag = _interviews_listing
+        if cached_signature != signature:
+            interviews = list_interviews()
+            logger.info("[API] Listed %d interviews", len(interviews))
+            body = app.json.dumps({
+                'success': True,
+                'interviews': interviews,
+                'count': len(interviews)
+            })
+            etag = hashlib.md5(body.encode(), usedforsecurity=False).hexdigest()
+            _interviews_listing = (signature, body, etag)
+
+        response = Response(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = INTERVIEW_CACHE_CONTROL
+        return response.make_conditional(request)
     except Exception as e:
-        logger.error(f"[API] List interviews error: {e}", exc_info=True)
+        _log_exception("[API] List interviews error: %s", e)
         return jsonify({
             'error': 'Failed to list interviews',
             'message': str(e)
@@ -731,10 +1238,10 @@ def get_user_interviews():
         claim_local_interviews(user_id)
 
         interviews = supabase_client.get_user_interviews(user_id, limit)
-        logger.info(f"[API] Retrieved {len(interviews)} interviews for user {user_id}")
+        logger.info("[API] Retrieved %d interviews for user %s", len(interviews), user_id)
         return jsonify(interviews)
     except Exception as e:
-        logger.error(f"[API] Failed to fetch user interviews: {e}", exc_info=True)
+        _log_exception("[API] Failed to fetch user interviews: %s", e)
         return jsonify([])
 
 
@@ -745,7 +1252,7 @@ def claim_local_interviews(user_id: str):
         # For now, just a placeholder
         pass
     except Exception as e:
-        logger.error(f"[API] Error claiming interviews: {e}")
+        logger.error("[API] Error claiming interviews: %s", e)
 
 
 @app.route('/api/interview/save', methods=['POST'])
@@ -755,7 +1262,7 @@ def save_interview_endpoint():
     Called by frontend after loading interview JSON from file.
     """
     try:
-        data = request.json or {}
+        data = request.get_json(silent=True) or {}
         user = get_current_user()
 
         if not user:
@@ -767,12 +1274,12 @@ def save_interview_endpoint():
             }), 401
 
         user_id = user.user.id
-        logger.info(f"[API] Saving interview for user {user_id}, keys: {list(data.keys())}")
+        logger.info("[API] Saving interview for user %s, keys: %s", user_id, list(data.keys()))
 
         interview_id = supabase_client.save_interview(user_id, data)
 
         if interview_id:
-            logger.info(f"[API] Interview saved to database: {interview_id}")
+            logger.info("[API] Interview saved to database: %s", interview_id)
             return jsonify({
                 'success': True,
                 'interview_id': interview_id,
@@ -786,7 +1293,7 @@ def save_interview_endpoint():
                 'saved_to': 'localStorage'
             }), 500
     except Exception as e:
-        logger.error(f"[API] Interview save error: {e}", exc_info=True)
+        _log_exception("[API] Interview save error: %s", e)
         return jsonify({
             'success': False,
             'message': str(e),
@@ -798,7 +1305,7 @@ def save_interview_endpoint():
 def save_feedback_endpoint():
     """Save feedback to database if authenticated, fallback to localStorage"""
     try:
-        data = request.json or {}
+        data = request.get_json(silent=True) or {}
         user = get_current_user()
 
         if not user:
@@ -814,12 +1321,12 @@ def save_feedback_endpoint():
         feedback_data = data.get('feedback')
 
         if not interview_id:
-            return jsonify({'error': 'interview_id required'}), 400
+            return _static_error('interview_id_required')
 
         success = supabase_client.save_feedback(user_id, interview_id, feedback_data)
 
         if success:
-            logger.info(f"[API] Feedback saved to database for interview: {interview_id}")
+            logger.info("[API] Feedback saved to database for interview: %s", interview_id)
             return jsonify({
                 'success': True,
                 'saved_to': 'database'
@@ -832,7 +1339,7 @@ def save_feedback_endpoint():
                 'saved_to': 'localStorage'
             }), 500
     except Exception as e:
-        logger.error(f"[API] Feedback save error: {e}", exc_info=True)
+        _log_exception("[API] Feedback save error: %s", e)
         return jsonify({
             'success': False,
             'message': str(e),
@@ -848,11 +1355,10 @@ def get_feedback_by_id(interview_id):
         user_id = get_user_id()
 
         # Validate UUID format
-        import uuid
         try:
             uuid.UUID(interview_id)
         except ValueError:
-            return jsonify({'error': 'Invalid interview ID'}), 400
+            return _static_error('invalid_interview_id')
 
         # Get feedback from database
         feedback = supabase_client.get_feedback(interview_id)
@@ -862,13 +1368,13 @@ def get_feedback_by_id(interview_id):
 
         # Verify user owns this interview
         if feedback.get('user_id') != user_id:
-            return jsonify({'error': 'Unauthorized'}), 403
+            return _static_error('unauthorized')
 
-        logger.info(f"[API] Feedback retrieved for interview: {interview_id}")
+        logger.info("[API] Feedback retrieved for interview: %s", interview_id)
         return jsonify(feedback)
 
     except Exception as e:
-        logger.error(f"[API] Feedback fetch error: {e}", exc_info=True)
+        _log_exception("[API] Feedback fetch error: %s", e)
         return jsonify({}), 500
 
 
@@ -896,7 +1402,7 @@ def format_conversation_with_merge(conversation_dict):
         return merged_turns
 
     except Exception as e:
-        logger.error(f"[FORMAT] Conversation format error: {e}", exc_info=True)
+        _log_exception("[FORMAT] Conversation format error: %s", e)
         return []
 
 
@@ -921,11 +1427,10 @@ def get_interview(interview_id):
         user_id = get_user_id()
 
         # Validate UUID format
-        import uuid
         try:
             uuid.UUID(interview_id)
         except ValueError:
-            return jsonify({'error': 'Invalid interview ID format'}), 400
+            return _static_error('invalid_interview_id_format')
 
         # Fetch from database
         interview = supabase_client.get_interview_by_id(user_id, interview_id)
@@ -935,7 +1440,7 @@ def get_interview(interview_id):
             interview = supabase_client.get_interview_by_room_name(user_id, interview_id)
 
         if not interview:
-            logger.warning(f"[API] Interview not found: {interview_id}")
+            logger.warning("[API] Interview not found: %s", interview_id)
             return jsonify({
                 'error': 'Interview not found',
                 'message': f'No interview found with ID: {interview_id}'
@@ -976,29 +1481,39 @@ def get_interview(interview_id):
         }
 
         logger.info(
-            f"[API] Retrieved interview {interview_id}: "
-            f"{len(ordered_conversation)} turns ({len(agent_msgs)} agent, {merged_user_count} candidate merged)"
+            "[API] Retrieved interview %s: %d turns (%d agent, %d candidate merged)",
+            interview_id, len(ordered_conversation), len(agent_msgs), merged_user_count
         )
 
-        return jsonify({
+        # Validate against the serialized payload, so edited rows or a changed
+        # response shape never match a stale validator; unchanged ones get a 304
+        body = app.json.dumps({
             'ordered_conversation': ordered_conversation,
             'meta': meta
         })
+        response = Response(body, mimetype='application/json')
+        response.set_etag(hashlib.md5(body.encode(), usedforsecurity=False).hexdigest())
+        response.headers['Cache-Control'] = INTERVIEW_CACHE_CONTROL
+        return response.make_conditional(request)
 
     except Exception as e:
-        logger.error(f"[API] Get interview error: {e}", exc_info=True)
+        _log_exception("[API] Get interview error: %s", e)
         return jsonify({
             'error': 'Failed to load interview',
             'message': str(e)
         }), 500
 
 
+# Path traversal markers rejected in filename route parameters
+_UNSAFE_FILENAME = re.compile(r'\.\.|[/\\]')
+
+
 @app.route('/api/interview/<filename>/summary')
 def get_interview_summary_api(filename):
     """Get interview summary without full transcript."""
     try:
-        if '..' in filename or '/' in filename or '\\' in filename:
-            return jsonify({'error': 'Invalid filename'}), 400
+        if _UNSAFE_FILENAME.search(filename):
+            return _static_error('invalid_filename')
             
         summary = get_interview_summary(filename)
         
@@ -1011,7 +1526,7 @@ def get_interview_summary_api(filename):
         })
         
     except Exception as e:
-        logger.error(f"[API] Interview summary error: {e}", exc_info=True)
+        _log_exception("[API] Interview summary error: %s", e)
         return jsonify({
             'error': 'Failed to get summary',
             'message': str(e)
@@ -1020,9 +1535,77 @@ def get_interview_summary_api(filename):
 
 # ==================== FEEDBACK API ====================
 
-# Feedback cache for storing generated feedback
+# One connection pool for all OpenAI calls. Keys are per user (BYOK), so each
+# key gets its own lightweight OpenAI wrapper on top of this client, reusing
+# pooled TLS connections instead of building a new pool each time.
+OPENAI_CLIENT_CACHE_SIZE = int(os.getenv('OPENAI_CLIENT_CACHE_SIZE', '64'))
+_openai_http_client = httpx.Client(
+    timeout=httpx.Timeout(120.0, connect=10.0),
+    limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+)
+atexit.register(_openai_http_client.close)
+
+
+@lru_cache(maxsize=OPENAI_CLIENT_CACHE_SIZE)
+def _openai_client(api_key):
+    """Return the OpenAI client for the user's key, backed by the shared pool."""
+    return OpenAI(api_key=api_key, http_client=_openai_http_client)
+
+# Feedback cache for storing generated feedback. Gunicorn runs a single worker
+# process (agent subprocesses are tracked in memory), so this dict is already
+# shared by every request thread; entries expire after FEEDBACK_CACHE_TTL_SECONDS
+# and each feedback cache holds at most FEEDBACK_CACHE_MAX_ENTRIES
+FEEDBACK_CACHE_TTL_SECONDS = int(os.getenv('FEEDBACK_CACHE_TTL_SECONDS', '86400'))
+FEEDBACK_CACHE_MAX_ENTRIES = int(os.getenv('FEEDBACK_CACHE_MAX_ENTRIES', '512'))
 _feedback_cache = {}
 
+# Combined scores + feedback results keyed by (user_id, interview_id); saved
+# interviews are insert-only, so a result never goes stale once generated
+_full_feedback_cache = {}
+
+
+def _bounded_put(cache, key, value):
+    """Insert into a feedback cache, evicting the oldest entries past the size cap."""
+    cache.pop(key, None)
+    while len(cache) >= FEEDBACK_CACHE_MAX_ENTRIES:
+        cache.pop(next(iter(cache)), None)
+    cache[key] = value
+
+
+# Feedback generations in progress per (user_id, interview_id). The first
+# request calls OpenAI; duplicates (a double-clicked button, a second tab)
+# wait for it and answer from _feedback_cache instead of paying again
+FEEDBACK_INFLIGHT_WAIT_SECONDS = float(os.getenv('FEEDBACK_INFLIGHT_WAIT_SECONDS', '120'))
+_feedback_inflight = {}
+_feedback_inflight_lock = threading.Lock()
+
+
+def _join_feedback_flight(key):
+    """Return (event, is_leader); only the leader should generate the feedback."""
+    with _feedback_inflight_lock:
+        event = _feedback_inflight.get(key)
+        if event is not None:
+            return event, False
+        event = _feedback_inflight[key] = threading.Event()
+        return event, True
+
+
+def _leave_feedback_flight(key, event):
+    """Finish a leader's generation and wake any waiting duplicates."""
+    with _feedback_inflight_lock:
+        if _feedback_inflight.get(key) is event:
+            del _feedback_inflight[key]
+    event.set()
+
+
+def _fresh_feedback(interview_id):
+    """Return the cached feedback entry for an interview, dropping it once expired."""
+    cached = _feedback_cache.get(interview_id)
+    if cached and time.time() - cached['cached_at'] >= FEEDBACK_CACHE_TTL_SECONDS:
+        _feedback_cache.pop(interview_id, None)
+        return None
+    return cached
+
 
 @app.route('/api/feedback/cached/<interview_id>')
 def get_cached_feedback(interview_id):
@@ -1036,9 +1619,10 @@ def get_cached_feedback(interview_id):
         Cached feedback or 404 if not found.
     """
     try:
-        if interview_id in _feedback_cache:
-            cached = _feedback_cache[interview_id]
-            logger.info(f"[API] Returning cached feedback for: {interview_id}")
+        cached = _fresh_feedback(interview_id)
+        
+        if cached:
+            logger.info("[API] Returning cached feedback for: %s", interview_id)
             return jsonify({
                 'success': True,
                 'interview_id': interview_id,
@@ -1053,12 +1637,76 @@ def get_cached_feedback(interview_id):
         }), 404
         
     except Exception as e:
-        logger.error(f"[API] Get cached feedback error: {e}", exc_info=True)
+        _log_exception("[API] Get cached feedback error: %s", e)
         return jsonify({
             'error': 'Failed to get cached feedback',
             'message': str(e)
         }), 500
 
+# Saved interviews are insert-only, so the formatted context for a
+# (user_id, interview_id) pair never changes once built
+INTERVIEW_CONTEXT_CACHE_SIZE = int(os.getenv('INTERVIEW_CONTEXT_CACHE_SIZE', '256'))
+
+# Transcript speaker labels; any non-agent turn is the candidate
+_TRANSCRIPT_ROLES = {'agent': 'INTERVIEWER'}
+
+# Recent lookup misses, so pages polling for a not-yet-saved interview get
+# their 404 without a database round trip on every probe
+INTERVIEW_MISS_TTL_SECONDS = float(os.getenv('INTERVIEW_MISS_TTL_SECONDS', '2.0'))
+_INTERVIEW_MISS_CACHE_SIZE = 1024
+_interview_misses = {}
+
+
+@lru_cache(maxsize=INTERVIEW_CONTEXT_CACHE_SIZE)
+def _build_interview_context(user_id, interview_id):
+    """
+    Fetch an interview and format it for the feedback prompts.
+
+    Memoized per (user_id, interview_id) so the scores and feedback calls
+    for the same interview share one database fetch and transcript build.
+    Raises LookupError (never cached) when there is nothing to analyze.
+
+    Returns:
+        tuple: (interview_chat, candidate_profile, job_summary, meta, conversation)
+    """
+    # Load interview from database
+    interview = supabase_client.get_interview_by_id(user_id, interview_id)
+    if not interview:
+        raise LookupError(f'Could not find interview: {interview_id}')
+
+    # Format conversation from database format with proper merging
+    conversation = format_conversation_with_merge(interview.get('conversation', {}))
+
+    if not conversation:
+        raise LookupError('No conversation found in this interview')
+
+    # Format transcript for LLM
+    interview_chat = "\n\n".join(
+        f"{_TRANSCRIPT_ROLES.get(turn['role'], 'CANDIDATE')}"
+        f"{' [' + stage + ']' if (stage := turn.get('stage')) else ''}: {turn['text']}"
+        for turn in conversation
+    )
+
+    # Build metadata
+    meta = {
+        'candidate': interview.get('candidate_name', 'Unknown'),
+        'interview_date': interview.get('interview_date'),
+        'job_role': interview.get('job_role'),
+        'experience_level': interview.get('experience_level'),
+        'source': 'database'
+    }
+
+    # Build candidate profile and job summary
+    candidate_profile = f"Name: {meta.get('candidate', 'Unknown')}"
+    if meta.get('experience_level'):
+        candidate_profile += f"\nExperience Level: {meta.get('experience_level', 'Not specified')}"
+
+    job_summary = f"Role: {meta.get('job_role', 'Not specified')}"
+
+    logger.info("[FEEDBACK] Loaded interview context for %s from database", interview_id)
+    return interview_chat, candidate_profile, job_summary, meta, conversation
+
+
 def _load_interview_context(interview_id):
     """
     Helper to load interview transcript and context for feedback generation from database.
@@ -1073,54 +1721,93 @@ def _load_interview_context(interview_id):
             return None, None, None, None, None, 'Authentication required'
 
         # Validate UUID format
-        import uuid
         try:
             uuid.UUID(interview_id)
         except ValueError:
             return None, None, None, None, None, f'Invalid interview ID format: {interview_id}'
 
-        # Load interview from database
-        interview = supabase_client.get_interview_by_id(user_id, interview_id)
-        if not interview:
-            return None, None, None, None, None, f'Could not find interview: {interview_id}'
+        miss_key = (user_id, interview_id)
+        miss = _interview_misses.get(miss_key)
+        if miss and time.monotonic() - miss[0] < INTERVIEW_MISS_TTL_SECONDS:
+            return None, None, None, None, None, miss[1]
 
-        # Format conversation from database format with proper merging
-        conversation = format_conversation_with_merge(interview.get('conversation', {}))
+        try:
+            return (*_build_interview_context(user_id, interview_id), None)
+        except LookupError as e:
+            _interview_misses.pop(miss_key, None)
+            if len(_interview_misses) >= _INTERVIEW_MISS_CACHE_SIZE:
+                _interview_misses.pop(next(iter(_interview_misses)), None)
+            _interview_misses[miss_key] = (time.monotonic(), str(e))
+            return None, None, None, None, None, str(e)
 
-        if not conversation:
-            return None, None, None, None, None, 'No conversation found in this interview'
+    except Exception as e:
+        _log_exception("[FEEDBACK] Error loading interview context: %s", e)
+        return None, None, None, None, None, f'Error loading interview: {str(e)}'
 
-        # Format transcript for LLM
-        transcript_lines = []
-        for turn in conversation:
-            role = "INTERVIEWER" if turn['role'] == 'agent' else "CANDIDATE"
-            stage_info = f" [{turn['stage']}]" if turn.get('stage') else ""
-            transcript_lines.append(f"{role}{stage_info}: {turn['text']}")
 
-        interview_chat = "\n\n".join(transcript_lines)
+# Streamed feedback responses; X-Accel-Buffering stops a fronting nginx
+# from holding deltas back until the whole completion has arrived
+_SSE_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
 
-        # Build metadata
-        meta = {
-            'candidate': interview.get('candidate_name', 'Unknown'),
-            'interview_date': interview.get('interview_date'),
-            'job_role': interview.get('job_role'),
-            'experience_level': interview.get('experience_level'),
-            'source': 'database'
-        }
 
-        # Build candidate profile and job summary
-        candidate_profile = f"Name: {meta.get('candidate', 'Unknown')}"
-        if meta.get('experience_level'):
-            candidate_profile += f"\nExperience Level: {meta.get('experience_level', 'Not specified')}"
+def _feedback_meta(meta, conversation):
+    """Response metadata shared by the feedback endpoints."""
+    return {
+        'candidate': meta.get('candidate'),
+        'interview_date': meta.get('interview_date'),
+        'total_turns': len(conversation),
+        'model': 'gpt-4o-mini'
+    }
 
-        job_summary = f"Role: {meta.get('job_role', 'Not specified')}"
 
-        logger.info(f"[FEEDBACK] Loaded interview context for {interview_id} from database")
-        return interview_chat, candidate_profile, job_summary, meta, conversation, None
+def _scores_request(candidate_profile, job_summary, interview_chat):
+    """Chat completion parameters for structured score extraction."""
+    return {
+        'model': "gpt-4o-mini",
+        'messages': [
+            {"role": "system", "content": FEEDBACKSCORES.system},
+            {"role": "user", "content": build_feedback_scores_prompt(candidate_profile, job_summary, interview_chat)}
+        ],
+        'temperature': 0.3,  # Lower temperature for consistent structure
+        'max_tokens': 800,
+        'response_format': {"type": "json_object"}  # Model returns bare JSON, no code fences
+    }
 
-    except Exception as e:
-        logger.error(f"[FEEDBACK] Error loading interview context: {e}", exc_info=True)
-        return None, None, None, None, None, f'Error loading interview: {str(e)}'
+
+def _feedback_request(candidate_profile, job_summary, interview_chat):
+    """Chat completion parameters for the detailed chain-of-thought feedback."""
+    return {
+        'model': "gpt-4o-mini",
+        'messages': [
+            {"role": "system", "content": build_post_interview_feedback_prompt()},
+            {"role": "user", "content": build_post_interview_feedback_user_prompt(candidate_profile, job_summary, interview_chat)}
+        ],
+        'temperature': 0.7,
+        'max_tokens': 3000  # Increased for comprehensive feedback
+    }
+
+
+def _parse_scores(scores_text):
+    """Parse the model's scores JSON, falling back to neutral scores if malformed."""
+    try:
+        return app.json.loads(scores_text)
+    except (TypeError, ValueError) as e:
+        logger.error("[API] Failed to parse scores JSON: %s", e)
+        logger.error("[API] Raw response: %s", scores_text)
+        # Return a fallback structure
+        return {
+            'overall_score': 3.0,
+            'summary_headline': 'Analysis complete',
+            'competencies': [
+                {'name': 'Technical Skills', 'score': 3, 'max_score': 5, 'quick_take': 'Demonstrated relevant experience'},
+                {'name': 'Communication', 'score': 3, 'max_score': 5, 'quick_take': 'Room for clearer responses'},
+                {'name': 'Problem-Solving', 'score': 3, 'max_score': 5, 'quick_take': 'Showed analytical thinking'}
+            ],
+            'top_strength': 'Relevant project experience',
+            'top_improvement': 'Structure answers more clearly',
+            'filler_word_count': 0,
+            'answer_structure_score': 3
+        }
 
 
 @app.route('/api/feedback/scores', methods=['POST'])
@@ -1134,25 +1821,23 @@ def generate_feedback_scores():
     
     Expected JSON body:
         - interview_id: Interview filename or identifier
+        - stream: (optional) If true, respond with server-sent events
         
     Returns:
         Structured scores with competencies, overall score, and headline.
+        With stream=true: text/event-stream of `data: {"delta": ...}` events
+        carrying the raw JSON as it is generated, then an `event: done` with
+        the parsed response payload (or `event: error`).
     """
-    import json as json_module
-    from openai import OpenAI
-    from prompts import FEEDBACKSCORES
-    
     try:
-        data = request.json or {}
+        data = request.get_json(silent=True) or {}
         interview_id = data.get('interview_id')
+        stream = bool(data.get('stream'))
         
         if not interview_id:
-            return jsonify({
-                'error': 'Missing interview_id',
-                'message': 'Please provide an interview_id'
-            }), 400
+            return _static_error('missing_interview_id')
             
-        logger.info(f"[API] Feedback scores requested for: {interview_id}")
+        logger.info("[API] Feedback scores requested for: %s", interview_id)
         
         # Load interview context
         interview_chat, candidate_profile, job_summary, meta, conversation, error = _load_interview_context(interview_id)
@@ -1160,83 +1845,73 @@ def generate_feedback_scores():
         if error:
             return jsonify({'error': 'Interview not found', 'message': error}), 404
         
-        # Build scores extraction prompt
-        user_prompt = FEEDBACKSCORES.user_template.format(
-            candidate_profile=candidate_profile,
-            job_summary=job_summary,
-            interview_chat=interview_chat
-        )
-
-        # Get authenticated user's OpenAI key from database (BYOK model)
+        # Reuse a combined /api/feedback/full result when one exists
         user_id = get_user_id()
+        full_result = _full_feedback_cache.get((user_id, interview_id))
+        if full_result:
+            return jsonify({
+                'success': True,
+                'interview_id': interview_id,
+                'scores': full_result['scores'],
+                'meta': _feedback_meta(meta, conversation)
+            })
+        
+        # Get authenticated user's OpenAI key from database (BYOK model)
         keys = supabase_client.get_api_keys(user_id)
 
         if not keys or not keys.get('openai_key'):
-            return jsonify({
-                'error': 'API key not configured',
-                'message': 'Please configure your OpenAI API key in Settings'
-            }), 400
+            return _static_error('openai_key_missing')
 
-        logger.info(f"[API] Extracting scores via OpenAI for {interview_id}")
+        logger.info("[API] Extracting scores via OpenAI for %s", interview_id)
 
-        client = OpenAI(api_key=keys['openai_key'])
-        
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": FEEDBACKSCORES.system},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.3,  # Lower temperature for consistent structure
-            max_tokens=800
-        )
-        
-        scores_text = response.choices[0].message.content
+        client = _openai_client(keys['openai_key'])
+        request_kwargs = _scores_request(candidate_profile, job_summary, interview_chat)
         
-        # Parse JSON response
-        try:
-            # Clean up response (remove markdown code blocks if present)
-            cleaned = scores_text.strip()
-            if cleaned.startswith('```'):
-                # Remove ```json and closing ```
-                lines = cleaned.split('\n')
-                cleaned = '\n'.join(lines[1:-1] if lines[-1].strip() == '```' else lines[1:])
+        def build_response_data(scores_text):
+            """Parse the model's JSON and build the response payload."""
+            scores_data = _parse_scores(scores_text)
             
-            scores_data = json_module.loads(cleaned)
-        except json_module.JSONDecodeError as e:
-            logger.error(f"[API] Failed to parse scores JSON: {e}")
-            logger.error(f"[API] Raw response: {scores_text}")
-            # Return a fallback structure
-            scores_data = {
-                'overall_score': 3.0,
-                'summary_headline': 'Analysis complete',
-                'competencies': [
-                    {'name': 'Technical Skills', 'score': 3, 'max_score': 5, 'quick_take': 'Demonstrated relevant experience'},
-                    {'name': 'Communication', 'score': 3, 'max_score': 5, 'quick_take': 'Room for clearer responses'},
-                    {'name': 'Problem-Solving', 'score': 3, 'max_score': 5, 'quick_take': 'Showed analytical thinking'}
-                ],
-                'top_strength': 'Relevant project experience',
-                'top_improvement': 'Structure answers more clearly',
-                'filler_word_count': 0,
-                'answer_structure_score': 3
+            logger.info("[API] Scores extracted successfully for %s", interview_id)
+            
+            return {
+                'success': True,
+                'interview_id': interview_id,
+                'scores': scores_data,
+                'meta': _feedback_meta(meta, conversation)
             }
         
-        logger.info(f"[API] Scores extracted successfully for {interview_id}")
+        if stream:
+            def generate_events():
+                parts = []
+                try:
+                    completion = client.chat.completions.create(stream=True, **request_kwargs)
+                    for chunk in completion:
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if delta:
+                            parts.append(delta)
+                            yield f"data: {app.json.dumps({'delta': delta})}\n\n"
+                    
+                    response_data = build_response_data(''.join(parts))
+                    yield f"event: done\ndata: {app.json.dumps(response_data)}\n\n"
+                except Exception as e:
+                    _log_exception("[API] Scores stream error: %s", e)
+                    error_data = {'error': 'Scores extraction failed', 'message': str(e)}
+                    yield f"event: error\ndata: {app.json.dumps(error_data)}\n\n"
+            
+            return Response(
+                stream_with_context(generate_events()),
+                mimetype='text/event-stream',
+                headers=_SSE_HEADERS
+            )
         
-        return jsonify({
-            'success': True,
-            'interview_id': interview_id,
-            'scores': scores_data,
-            'meta': {
-                'candidate': meta.get('candidate'),
-                'interview_date': meta.get('interview_date'),
-                'total_turns': len(conversation),
-                'model': 'gpt-4o-mini'
-            }
-        })
+        response = client.chat.completions.create(**request_kwargs)
+        
+        return jsonify(build_response_data(response.choices[0].message.content))
         
     except Exception as e:
-        logger.error(f"[API] Scores extraction error: {e}", exc_info=True)
+        _log_exception("[API] Scores extraction error: %s", e)
         return jsonify({
             'error': 'Scores extraction failed',
             'message': str(e)
@@ -1254,26 +1929,172 @@ def generate_feedback():
     Expected JSON body:
         - interview_id: Interview filename or identifier
         - scores: (optional) Pre-computed scores to include in response
+        - stream: (optional) If true, respond with server-sent events
         
     Returns:
         Structured feedback with strengths, improvements, and practice plan.
+        With stream=true: text/event-stream of `data: {"delta": ...}` events,
+        then an `event: done` with the full response payload (or `event: error`).
     """
-    import json as json_module
-    from openai import OpenAI
-    from prompts import build_post_interview_feedback_prompt
-    
     try:
-        data = request.json or {}
+        data = request.get_json(silent=True) or {}
         interview_id = data.get('interview_id')
         provided_scores = data.get('scores')  # Optional: pass scores from stage 1
+        stream = bool(data.get('stream'))
         
         if not interview_id:
+            return _static_error('missing_interview_id')
+            
+        logger.info("[API] Feedback requested for: %s", interview_id)
+        
+        # Load interview context
+        interview_chat, candidate_profile, job_summary, meta, conversation, error = _load_interview_context(interview_id)
+        
+        if error:
+            return jsonify({'error': 'Interview not found', 'message': error}), 404
+        
+        # Reuse a combined /api/feedback/full result when one exists
+        user_id = get_user_id()
+        full_result = _full_feedback_cache.get((user_id, interview_id))
+        if full_result:
             return jsonify({
-                'error': 'Missing interview_id',
-                'message': 'Please provide an interview_id'
-            }), 400
+                'success': True,
+                'interview_id': interview_id,
+                'feedback': full_result['feedback'],
+                'scores': provided_scores or full_result['scores'],
+                'meta': _feedback_meta(meta, conversation)
+            })
+        
+        # Answer repeat requests before building the prompt or calling OpenAI
+        cached = _fresh_feedback(interview_id)
+        if cached:
+            logger.info("[API] Returning cached feedback for: %s", interview_id)
+            response_data = {
+                'success': True,
+                'interview_id': interview_id,
+                'feedback': cached['feedback'],
+                'meta': _feedback_meta(meta, conversation)
+            }
+            if provided_scores:
+                response_data['scores'] = provided_scores
+            return jsonify(response_data)
+        
+        # Get authenticated user's OpenAI key from database (BYOK model)
+        keys = supabase_client.get_api_keys(user_id)
+
+        if not keys or not keys.get('openai_key'):
+            return _static_error('openai_key_missing')
+
+        logger.info("[API] Generating feedback via OpenAI for %s", interview_id)
+
+        client = _openai_client(keys['openai_key'])
+        request_kwargs = _feedback_request(candidate_profile, job_summary, interview_chat)
+        response_meta = _feedback_meta(meta, conversation)
+        
+        def response_payload(feedback_text):
+            """Build the response payload for finished feedback."""
+            response_data = {
+                'success': True,
+                'interview_id': interview_id,
+                'feedback': feedback_text,
+                'meta': response_meta
+            }
+            
+            # Include scores if provided
+            if provided_scores:
+                response_data['scores'] = provided_scores
+            return response_data
+        
+        def build_response_data(feedback_text):
+            """Cache the finished feedback and build the response payload."""
+            _bounded_put(_feedback_cache, interview_id, {
+                'feedback': feedback_text,
+                'cached_at': time.time(),
+                'model': 'gpt-4o-mini'
+            })
             
-        logger.info(f"[API] Feedback requested for: {interview_id}")
+            logger.info("[API] Feedback generated and cached for %s", interview_id)
+            return response_payload(feedback_text)
+        
+        flight_key = (user_id, interview_id)
+        flight, is_leader = _join_feedback_flight(flight_key)
+        if not is_leader:
+            logger.info("[API] Waiting on in-flight feedback for %s", interview_id)
+            flight.wait(FEEDBACK_INFLIGHT_WAIT_SECONDS)
+            cached = _fresh_feedback(interview_id)
+            if cached:
+                return jsonify(response_payload(cached['feedback']))
+            # The first request failed or timed out; generate independently
+        
+        if stream:
+            def generate_events():
+                parts = []
+                try:
+                    completion = client.chat.completions.create(stream=True, **request_kwargs)
+                    for chunk in completion:
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if delta:
+                            parts.append(delta)
+                            yield f"data: {app.json.dumps({'delta': delta})}\n\n"
+                    
+                    response_data = build_response_data(''.join(parts))
+                    yield f"event: done\ndata: {app.json.dumps(response_data)}\n\n"
+                except Exception as e:
+                    _log_exception("[API] Feedback stream error: %s", e)
+                    error_data = {'error': 'Feedback generation failed', 'message': str(e)}
+                    yield f"event: error\ndata: {app.json.dumps(error_data)}\n\n"
+            
+            response = Response(
+                stream_with_context(generate_events()),
+                mimetype='text/event-stream',
+                headers=_SSE_HEADERS
+            )
+            if is_leader:
+                # Runs once the stream is finished (or the client went away)
+                response.call_on_close(lambda: _leave_feedback_flight(flight_key, flight))
+            return response
+        
+        try:
+            response = client.chat.completions.create(**request_kwargs)
+            return jsonify(build_response_data(response.choices[0].message.content))
+        finally:
+            if is_leader:
+                _leave_feedback_flight(flight_key, flight)
+        
+    except Exception as e:
+        _log_exception("[API] Feedback error: %s", e)
+        return jsonify({
+            'error': 'Feedback generation failed',
+            'message': str(e)
+        }), 500
+
+
+@app.route('/api/feedback/full', methods=['POST'])
+@require_auth
+def generate_full_feedback():
+    """
+    Generate scores and detailed feedback in a single OpenAI call.
+    
+    Sends the transcript once with a structured-output schema covering both
+    payloads, instead of once per stage. The result is cached so follow-up
+    calls to /api/feedback/scores and /api/feedback are served from it.
+    
+    Expected JSON body:
+        - interview_id: Interview filename or identifier
+        
+    Returns:
+        Structured scores, markdown feedback, and interview metadata.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        interview_id = data.get('interview_id')
+        
+        if not interview_id:
+            return _static_error('missing_interview_id')
+            
+        logger.info("[API] Full feedback requested for: %s", interview_id)
         
         # Load interview context
         interview_chat, candidate_profile, job_summary, meta, conversation, error = _load_interview_context(interview_id)
@@ -1281,89 +2102,321 @@ def generate_feedback():
         if error:
             return jsonify({'error': 'Interview not found', 'message': error}), 404
         
-        # Build the feedback prompt using chain-of-thought approach
-        system_prompt = build_post_interview_feedback_prompt()
+        user_id = get_user_id()
+        cache_key = (user_id, interview_id)
+        full_result = _full_feedback_cache.get(cache_key)
+        
+        if not full_result:
+            # Get authenticated user's OpenAI key from database (BYOK model)
+            keys = supabase_client.get_api_keys(user_id)
+
+            if not keys or not keys.get('openai_key'):
+                return _static_error('openai_key_missing')
+
+            logger.info("[API] Generating scores and feedback via OpenAI for %s", interview_id)
+
+            client = _openai_client(keys['openai_key'])
+            
+            response = client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": build_full_feedback_prompt()},
+                    {"role": "user", "content": build_full_feedback_user_prompt(candidate_profile, job_summary, interview_chat)}
+                ],
+                temperature=0.5,
+                max_tokens=4000,  # Scores block plus comprehensive feedback
+                response_format={
+                    "type": "json_schema",
+                    "json_schema": {
+                        "name": "interview_feedback",
+                        "strict": True,
+                        "schema": FEEDBACKFULL.response_schema
+                    }
+                }
+            )
+            
+            choice = response.choices[0]
+            try:
+                full_result = app.json.loads(choice.message.content)
+            except (TypeError, ValueError) as e:
+                # Schema-constrained output only fails to parse when truncated
+                logger.error("[API] Failed to parse full feedback JSON (finish_reason=%s): %s", choice.finish_reason, e)
+                return jsonify({
+                    'error': 'Feedback generation failed',
+                    'message': 'Model response was incomplete, please try again'
+                }), 502
+            
+            _bounded_put(_full_feedback_cache, cache_key, full_result)
+            _bounded_put(_feedback_cache, interview_id, {
+                'feedback': full_result['feedback'],
+                'cached_at': time.time(),
+                'model': 'gpt-4o-mini'
+            })
+            logger.info("[API] Scores and feedback generated and cached for %s", interview_id)
+        
+        return jsonify({
+            'success': True,
+            'interview_id': interview_id,
+            'scores': full_result['scores'],
+            'feedback': full_result['feedback'],
+            'meta': _feedback_meta(meta, conversation)
+        })
         
-        user_prompt = f"""Please analyze this mock interview and provide detailed feedback.
+    except Exception as e:
+        _log_exception("[API] Full feedback error: %s", e)
+        return jsonify({
+            'error': 'Feedback generation failed',
+            'message': str(e)
+        }), 500
 
-<CANDIDATE_PROFILE>
-{candidate_profile}
-</CANDIDATE_PROFILE>
 
-<JOB_SUMMARY>
-{job_summary}
-</JOB_SUMMARY>
+# Submitted OpenAI batches keyed by batch_id: owner, interviews, and the
+# summary recorded once the results have been collected
+_feedback_batches = {}
 
-<INTERVIEW_CHAT>
-{interview_chat}
-</INTERVIEW_CHAT>
+# Collected summaries are kept for FEEDBACK_BATCH_TTL_SECONDS; batches never
+# polled to completion are dropped that long after their 24h window closes
+FEEDBACK_BATCH_TTL_SECONDS = int(os.getenv('FEEDBACK_BATCH_TTL_SECONDS', '86400'))
+FEEDBACK_BATCH_MAX_ENTRIES = int(os.getenv('FEEDBACK_BATCH_MAX_ENTRIES', '256'))
+_BATCH_COMPLETION_WINDOW_SECONDS = 24 * 60 * 60
 
-Provide your analysis and feedback following the output format specified."""
+# Batch states after which OpenAI will not produce further results
+_BATCH_TERMINAL_STATUSES = frozenset({'completed', 'failed', 'expired', 'cancelled'})
 
-        # Get authenticated user's OpenAI key from database (BYOK model)
+
+def _prune_feedback_batches():
+    """Drop expired feedback batches, then the oldest ones past the size cap."""
+    now = time.time()
+    for batch_id, job in list(_feedback_batches.items()):
+        if job['summary'] is not None:
+            expired = job['collected_at'] < now - FEEDBACK_BATCH_TTL_SECONDS
+        else:
+            expired = job['created_at'] < now - _BATCH_COMPLETION_WINDOW_SECONDS - FEEDBACK_BATCH_TTL_SECONDS
+        if expired:
+            _feedback_batches.pop(batch_id, None)
+    while len(_feedback_batches) >= FEEDBACK_BATCH_MAX_ENTRIES:
+        _feedback_batches.pop(next(iter(_feedback_batches)), None)
+
+
+def _collect_batch_results(output_text):
+    """
+    Group a batch output file by interview.
+
+    Returns:
+        dict: interview_id -> {'scores': ..., 'feedback': ...} for every
+        request that succeeded (either part may be missing)
+    """
+    results = {}
+    for line in output_text.splitlines():
+        if not line.strip():
+            continue
+        item = app.json.loads(line)
+        kind, _, interview_id = item.get('custom_id', '').partition(':')
+        response = item.get('response') or {}
+        if item.get('error') or response.get('status_code') != 200:
+            logger.warning("[API] Batch request %s failed: %s", item.get('custom_id'), item.get('error'))
+            continue
+        content = response['body']['choices'][0]['message']['content']
+        entry = results.setdefault(interview_id, {})
+        if kind == 'scores':
+            entry['scores'] = _parse_scores(content)
+        elif kind == 'feedback':
+            entry['feedback'] = content
+    return results
+
+
+@app.route('/api/feedback/batch', methods=['POST'])
+@require_auth
+def submit_feedback_batch():
+    """
+    Queue scores and feedback for many interviews on the OpenAI Batch API.
+    
+    Batch requests are billed at half price against a separate rate-limit
+    pool and complete within 24h, which suits bulk scoring sweeps that do
+    not need an interactive response.
+    
+    Expected JSON body:
+        - interview_ids: List of interview IDs
+        
+    Returns:
+        202 with the batch_id to poll, the submitted interview IDs, and the
+        IDs skipped (already cached or not found) with reasons.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        interview_ids = data.get('interview_ids')
+        
+        if not isinstance(interview_ids, list) or not interview_ids:
+            return jsonify({
+                'error': 'Missing interview_ids',
+                'message': 'interview_ids must be a non-empty list'
+            }), 400
+        
         user_id = get_user_id()
         keys = supabase_client.get_api_keys(user_id)
 
         if not keys or not keys.get('openai_key'):
+            return _static_error('openai_key_missing')
+        
+        lines = []
+        submitted = []
+        skipped = {}
+        for interview_id in dict.fromkeys(map(str, interview_ids)):
+            if (user_id, interview_id) in _full_feedback_cache:
+                skipped[interview_id] = 'Feedback already generated'
+                continue
+            
+            interview_chat, candidate_profile, job_summary, meta, conversation, error = _load_interview_context(interview_id)
+            if error:
+                skipped[interview_id] = error
+                continue
+            
+            for kind, body in (
+                ('scores', _scores_request(candidate_profile, job_summary, interview_chat)),
+                ('feedback', _feedback_request(candidate_profile, job_summary, interview_chat)),
+            ):
+                lines.append(app.json.dumps({
+                    'custom_id': f'{kind}:{interview_id}',
+                    'method': 'POST',
+                    'url': '/v1/chat/completions',
+                    'body': body
+                }))
+            submitted.append(interview_id)
+        
+        if not submitted:
             return jsonify({
-                'error': 'API key not configured',
-                'message': 'Please configure your OpenAI API key in Settings'
-            }), 400
-
-        logger.info(f"[API] Generating feedback via OpenAI for {interview_id}")
-
-        client = OpenAI(api_key=keys['openai_key'])
+                'success': True,
+                'batch_id': None,
+                'submitted': [],
+                'skipped': skipped
+            })
         
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.7,
-            max_tokens=3000  # Increased for comprehensive feedback
+        client = _openai_client(keys['openai_key'])
+        batch_file = client.files.create(
+            file=('feedback_batch.jsonl', '\n'.join(lines).encode()),
+            purpose='batch'
+        )
+        batch = client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint='/v1/chat/completions',
+            completion_window='24h'
         )
         
-        feedback_text = response.choices[0].message.content
-        
-        # Cache the feedback for future retrieval
-        import time as time_module
-        _feedback_cache[interview_id] = {
-            'feedback': feedback_text,
-            'cached_at': time_module.time(),
-            'model': 'gpt-4o-mini'
+        _prune_feedback_batches()
+        _feedback_batches[batch.id] = {
+            'user_id': user_id,
+            'interview_ids': submitted,
+            'created_at': time.time(),
+            'collected_at': None,
+            'summary': None
         }
+        logger.info("[API] Submitted feedback batch %s for %d interviews", batch.id, len(submitted))
         
-        logger.info(f"[API] Feedback generated and cached for {interview_id}")
-        
-        response_data = {
+        return jsonify({
             'success': True,
-            'interview_id': interview_id,
-            'feedback': feedback_text,
-            'meta': {
-                'candidate': meta.get('candidate'),
-                'interview_date': meta.get('interview_date'),
-                'total_turns': len(conversation),
-                'model': 'gpt-4o-mini'
-            }
-        }
+            'batch_id': batch.id,
+            'status': batch.status,
+            'submitted': submitted,
+            'skipped': skipped
+        }), 202
         
-        # Include scores if provided
-        if provided_scores:
-            response_data['scores'] = provided_scores
+    except Exception as e:
+        _log_exception("[API] Feedback batch submit error: %s", e)
+        return jsonify({
+            'error': 'Batch submission failed',
+            'message': str(e)
+        }), 500
+
+
+@app.route('/api/feedback/batch/<batch_id>')
+@require_auth
+def get_feedback_batch(batch_id):
+    """
+    Poll a feedback batch and collect its results once OpenAI finishes.
+    
+    Completed results are stored in the feedback caches, so later calls to
+    /api/feedback/scores, /api/feedback and /api/feedback/full for those
+    interviews are answered without another model call.
+    
+    Returns:
+        202 with the OpenAI status while the batch is running; otherwise the
+        final status with the interview IDs that completed and failed.
+    """
+    try:
+        user_id = get_user_id()
+        job = _feedback_batches.get(batch_id)
         
-        return jsonify(response_data)
+        if not job or job['user_id'] != user_id:
+            return jsonify({
+                'error': 'Batch not found',
+                'message': f'No feedback batch found with ID: {batch_id}'
+            }), 404
+        
+        if job['summary'] is None:
+            keys = supabase_client.get_api_keys(user_id)
+
+            if not keys or not keys.get('openai_key'):
+                return _static_error('openai_key_missing')
+            
+            client = _openai_client(keys['openai_key'])
+            batch = client.batches.retrieve(batch_id)
+            
+            if batch.status not in _BATCH_TERMINAL_STATUSES:
+                return jsonify({
+                    'success': True,
+                    'batch_id': batch_id,
+                    'status': batch.status
+                }), 202
+            
+            results = {}
+            if batch.output_file_id:
+                results = _collect_batch_results(client.files.content(batch.output_file_id).text)
+            
+            completed = []
+            for interview_id in job['interview_ids']:
+                result = results.get(interview_id, {})
+                if 'scores' not in result or 'feedback' not in result:
+                    continue
+                _bounded_put(_full_feedback_cache, (user_id, interview_id), result)
+                _bounded_put(_feedback_cache, interview_id, {
+                    'feedback': result['feedback'],
+                    'cached_at': time.time(),
+                    'model': 'gpt-4o-mini'
+                })
+                completed.append(interview_id)
+            
+            completed_set = set(completed)
+            job['summary'] = {
+                'status': batch.status,
+                'completed': completed,
+                'failed': [i for i in job['interview_ids'] if i not in completed_set]
+            }
+            job['collected_at'] = time.time()
+            logger.info(
+                "[API] Feedback batch %s %s: %d completed, %d failed",
+                batch_id, batch.status, len(completed), len(job['summary']['failed'])
+            )
+        
+        return jsonify({
+            'success': True,
+            'batch_id': batch_id,
+            **job['summary']
+        })
         
     except Exception as e:
-        logger.error(f"[API] Feedback error: {e}", exc_info=True)
+        _log_exception("[API] Feedback batch status error: %s", e)
         return jsonify({
-            'error': 'Feedback generation failed',
+            'error': 'Failed to get batch status',
             'message': str(e)
         }), 500
 
 
 # ==================== SKIP STAGE API ====================
 
+VALID_SKIP_STAGES = ('self_intro', 'past_experience', 'company_fit', 'closing')
+_VALID_SKIP_STAGE_SET = frozenset(VALID_SKIP_STAGES)
+_VALID_SKIP_STAGES_MESSAGE = f'Valid stages: {", ".join(VALID_SKIP_STAGES)}'
+
 @app.route('/api/skip-stage', methods=['POST'])
 def skip_stage():
     """
@@ -1381,31 +2434,24 @@ def skip_stage():
         - target_stage: Confirmed target stage
     """
     try:
-        data = request.json or {}
+        data = request.get_json(silent=True) or {}
         room_name = data.get('room_name')
         target_stage = data.get('target_stage')
         
         if not room_name:
-            return jsonify({
-                'error': 'Missing room_name',
-                'message': 'Please provide the room name'
-            }), 400
+            return _static_error('missing_room_name')
             
         if not target_stage:
-            return jsonify({
-                'error': 'Missing target_stage',
-                'message': 'Please specify which stage to skip to'
-            }), 400
+            return _static_error('missing_target_stage')
             
         # Validate target stage
-        valid_stages = ['self_intro', 'past_experience', 'company_fit', 'closing']
-        if target_stage not in valid_stages:
+        if target_stage not in _VALID_SKIP_STAGE_SET:
             return jsonify({
                 'error': 'Invalid target_stage',
-                'message': f'Valid stages: {", ".join(valid_stages)}'
+                'message': _VALID_SKIP_STAGES_MESSAGE
             }), 400
             
-        logger.info(f"[API] Skip stage request: {room_name} -> {target_stage}")
+        logger.info("[API] Skip stage request: %s -> %s", room_name, target_stage)
         
         # The actual skip is communicated via LiveKit data channel
         # This endpoint just validates and logs the request
@@ -1419,7 +2465,7 @@ def skip_stage():
         })
         
     except Exception as e:
-        logger.error(f"[API] Skip stage error: {e}", exc_info=True)
+        _log_exception("[API] Skip stage error: %s", e)
         return jsonify({
             'error': 'Skip request failed',
             'message': str(e)
@@ -1428,35 +2474,43 @@ def skip_stage():
 
 # ==================== HEALTH CHECK ====================
 
+@lru_cache(maxsize=64)
+def _healthy_body(active_worker_count, max_workers):
+    """Serialized healthy response, rebuilt only when the worker counts change."""
+    return app.json.dumps({
+        'status': 'healthy',
+        'database': 'configured',
+        'workers': {
+            'active': active_worker_count,
+            'max': max_workers
+        }
+    })
+
 
 @app.route('/health')
 def health_check():
-    """Health check endpoint for monitoring and deployment verification."""
+    """
+    Health check endpoint for monitoring and deployment verification.
+
+    HEAD liveness probes never reach this view; FastPathMiddleware answers
+    them before dispatch.
+    """
     try:
         # Verify Supabase environment credentials are set
-        supabase_url = os.getenv('SUPABASE_URL')
-        supabase_key = os.getenv('SUPABASE_SERVICE_KEY')
-
-        if not supabase_url or not supabase_key:
+        if not _SUPABASE_CONFIGURED:
             raise ValueError("Supabase credentials not configured")
 
         # Count active workers
         active_worker_count = len(worker_manager.active_workers)
         max_workers = worker_manager.max_workers
 
-        # logger.info(f"[HEALTH] Health check passed - {active_worker_count}/{max_workers} workers active")
+        # logger.info("[HEALTH] Health check passed - %s/%s workers active", active_worker_count, max_workers)
 
-        return jsonify({
-            'status': 'healthy',
-            'database': 'configured',
-            'workers': {
-                'active': active_worker_count,
-                'max': max_workers
-            }
-        }), 200
+        return Response(_healthy_body(active_worker_count, max_workers),
+                        status=200, mimetype='application/json')
 
     except Exception as e:
-        logger.error(f"[HEALTH] Health check failed: {e}", exc_info=True)
+        _log_exception("[HEALTH] Health check failed: %s", e)
         return jsonify({
             'status': 'unhealthy',
             'error': str(e)
@@ -1469,28 +2523,37 @@ def health_check():
 @app.errorhandler(404)
 def not_found(e):
     """Custom 404 handler."""
-    logger.warning(f"[ERROR] 404 - {request.path}")
+    logger.warning("[ERROR] 404 - %s", request.path)
     return render_template('error.html', error='Page not found'), 404
 
 
 @app.errorhandler(500)
 def internal_error(e):
     """Custom 500 handler."""
-    logger.error(f"[ERROR] 500 - {str(e)}", exc_info=True)
+    _log_exception("[ERROR] 500 - %s", e)
     return render_template('error.html', error='Internal server error'), 500
 
 
 if __name__ == '__main__':
-    logger.info("[MAIN] Starting Flask web server")
-    logger.info("[MAIN] Access the application at http://localhost:5000")
+    # Development server only; production runs `gunicorn app:app` (see gunicorn.conf.py)
+    port = int(os.getenv('FLASK_PORT', '5000'))
+    # Never enable the Werkzeug debugger when FLASK_ENV=production
+    debug = (
+        os.getenv('FLASK_DEBUG', 'true').lower() == 'true'
+        and os.getenv('FLASK_ENV') != 'production'
+    )
+
+    logger.info("[MAIN] Starting Flask development server")
+    logger.info("[MAIN] Access the application at http://localhost:%d", port)
 
     # Ensure interviews directory exists
     os.makedirs("interviews", exist_ok=True)
 
     # Run Flask app
     app.run(
-        debug=True,
-        port=5000,
+        debug=debug,
+        port=port,
         host='0.0.0.0',
+        threaded=True,
         use_reloader=False  # Disable auto-reload to prevent killing spawned workers
     )
\ No newline at end of file
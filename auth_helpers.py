@@ -1,7 +1,9 @@
 import os
+import time
 from functools import wraps
-from flask import session, redirect, url_for, request, jsonify
+from flask import g, session, redirect, url_for, request, jsonify
 from supabase import create_client
+import jwt
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,14 +12,64 @@ url = os.getenv('SUPABASE_URL')
 anon_key = os.getenv('SUPABASE_ANON_KEY')
 supabase = create_client(url, anon_key)
 
+# Users verified by Supabase, keyed by access token, so authenticated requests
+# skip the auth round trip. Entries live until the token's own expiry, capped
+# at AUTH_CACHE_TTL_SECONDS so revoked sessions are noticed soon after
+AUTH_CACHE_TTL_SECONDS = float(os.getenv('AUTH_CACHE_TTL_SECONDS', '60'))
+_AUTH_CACHE_MAX_ENTRIES = 4096
+_verified_users = {}
+
+
+def _token_expiry(access_token):
+    """Read exp from a token Supabase has already verified (no signature check)."""
+    try:
+        return jwt.decode(access_token, options={'verify_signature': False}).get('exp')
+    except jwt.PyJWTError:
+        return None
+
+
+def _remember_user(access_token, user):
+    """Cache a verified user until the token expires or the TTL runs out."""
+    expires_at = time.time() + AUTH_CACHE_TTL_SECONDS
+    token_exp = _token_expiry(access_token)
+    if token_exp is not None:
+        expires_at = min(expires_at, token_exp)
+
+    _verified_users.pop(access_token, None)
+    while len(_verified_users) >= _AUTH_CACHE_MAX_ENTRIES:
+        _verified_users.pop(next(iter(_verified_users)), None)
+    _verified_users[access_token] = (expires_at, user)
+
+
+def forget_current_user():
+    """Drop the session's token from the verified-user cache (call on logout)."""
+    access_token = session.get('access_token')
+    if access_token:
+        _verified_users.pop(access_token, None)
+
 def get_current_user():
-    """Get current authenticated user from session"""
+    """Get current authenticated user from session, memoized per request on g"""
     try:
         access_token = session.get('access_token')
         if not access_token:
             return None
 
-        user = supabase.auth.get_user(access_token)
+        # Keyed by token so a login/logout mid-request is not served stale
+        cached = g.get('_current_user')
+        if cached is not None and cached[0] == access_token:
+            return cached[1]
+
+        verified = _verified_users.get(access_token)
+        if verified and time.time() < verified[0]:
+            user = verified[1]
+        else:
+            user = supabase.auth.get_user(access_token)
+            if user:
+                _remember_user(access_token, user)
+            else:
+                _verified_users.pop(access_token, None)
+
+        g._current_user = (access_token, user)
         return user
     except Exception as e:
         logger.error(f"Error getting current user: {e}")
@@ -5,17 +5,25 @@ Caches interview conversation history in-memory for quick retrieval.
 Similar pattern to document_processor.py for consistency.
 """
 
+import bisect
 import hashlib
 import logging
+import struct
+import sys
+import threading
 import time
+from collections import Counter
 from typing import Optional, Dict, List, Union
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Slotted dataclasses (no per-instance __dict__) where supported (3.10+)
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(**_DATACLASS_OPTIONS)
 class ConversationMetadata:
     """Metadata for cached conversations."""
     candidate_name: str
@@ -34,7 +42,19 @@ class ConversationMetadata:
             self.skipped_stages = []
     
     def to_dict(self) -> dict:
-        return asdict(self)
+        # Flat fields, so build the dict directly instead of asdict's recursive copy
+        return {
+            'candidate_name': self.candidate_name,
+            'interview_date': self.interview_date,
+            'room_name': self.room_name,
+            'job_role': self.job_role,
+            'experience_level': self.experience_level,
+            'final_stage': self.final_stage,
+            'ended_by': self.ended_by,
+            'skipped_stages': list(self.skipped_stages),
+            'has_resume': self.has_resume,
+            'has_jd': self.has_jd,
+        }
 
 
 class ConversationCache:
@@ -42,12 +62,23 @@ class ConversationCache:
     Handles conversation history caching for interviews.
     
     Privacy-first: Stores only conversation data, not audio/video.
-    Uses MD5 hash of room_name + timestamp as cache key.
+    Uses a BLAKE2b hash of room_name + timestamp as cache key.
     """
 
     def __init__(self):
         """Initialize conversation cache with in-memory storage."""
         self.cache: Dict[str, dict] = {}
+        # Guards the cache together with its derived aggregates and indexes
+        self._cache_lock = threading.Lock()
+        # Bumped on every mutation so listings can detect stale snapshots
+        self.version = 0
+        # Aggregates and listing rows maintained on write, so stats and
+        # listings never rescan every cached conversation
+        self._total_messages = 0
+        self._by_level: Counter = Counter()
+        self._summaries: Dict[str, dict] = {}
+        # (interview_date, cache_key) kept in ascending order; listings walk it backwards
+        self._by_date: List[tuple] = []
         logger.info("[CONV_CACHE] Conversation cache initialized")
 
     def generate_cache_key(self, room_name: str, timestamp: float = None) -> str:
@@ -59,13 +90,61 @@ class ConversationCache:
             timestamp: Optional timestamp (defaults to current time)
             
         Returns:
-            Cache key (MD5 hash)
+            Cache key (16 hex chars)
         """
         if timestamp is None:
             timestamp = time.time()
         
-        key_string = f"{room_name}_{timestamp}"
-        return hashlib.md5(key_string.encode()).hexdigest()[:16]
+        hasher = hashlib.blake2b(room_name.encode(), digest_size=8)
+        hasher.update(struct.pack('<d', timestamp))
+        return hasher.hexdigest()
+
+    def _track(self, cache_key: str, data: dict, sign: int):
+        """Add (sign=1) or remove (sign=-1) an entry's share of the aggregates."""
+        total_msgs = data.get('total_messages', {})
+        self._total_messages += sign * (total_msgs.get('agent', 0) + total_msgs.get('user', 0))
+        level = data.get('metadata', {}).get('experience_level', 'unknown')
+        self._by_level[level] += sign
+        if self._by_level[level] <= 0:
+            del self._by_level[level]
+
+        date_key = (data.get('metadata', {}).get('interview_date') or '', cache_key)
+        if sign > 0:
+            self._summaries[cache_key] = self._summarize(cache_key, data)
+            bisect.insort(self._by_date, date_key)
+        else:
+            self._summaries.pop(cache_key, None)
+            index = bisect.bisect_left(self._by_date, date_key)
+            if index < len(self._by_date) and self._by_date[index] == date_key:
+                del self._by_date[index]
+
+    @staticmethod
+    def _summarize(cache_key: str, data: dict) -> dict:
+        """Build the list_conversations row for a cached entry."""
+        metadata = data.get('metadata', {})
+
+        # Get stages covered from agent messages
+        agent_msgs = data.get('conversation', {}).get('agent', [])
+        stages_covered = list({
+            stage for m in agent_msgs if (stage := m.get('stage'))
+        })
+
+        return {
+            'cache_key': cache_key,
+            'filename': cache_key,  # For compatibility with existing UI
+            'candidate': metadata.get('candidate_name', 'Unknown'),
+            'interview_date': metadata.get('interview_date'),
+            'room_name': metadata.get('room_name'),
+            'job_role': metadata.get('job_role', ''),
+            'experience_level': metadata.get('experience_level', ''),
+            'final_stage': metadata.get('final_stage', ''),
+            'ended_by': metadata.get('ended_by', 'unknown'),
+            'stages_covered': stages_covered,
+            'message_count': data.get('total_messages', {}),
+            'has_resume': metadata.get('has_resume', False),
+            'has_jd': metadata.get('has_jd', False),
+            'cached_at': data.get('cached_at', 0)
+        }
 
     def cache_conversation(
         self,
@@ -92,8 +171,7 @@ class ConversationCache:
             agent_msgs = conversation.get('agent', [])
             user_msgs = conversation.get('user', [])
             
-            # Store in cache
-            self.cache[cache_key] = {
+            entry = {
                 'conversation': conversation,
                 'metadata': metadata.to_dict() if isinstance(metadata, ConversationMetadata) else metadata,
                 'total_messages': {
@@ -103,6 +181,15 @@ class ConversationCache:
                 'cached_at': time.time(),
                 'cache_key': cache_key
             }
+
+            # Store in cache, replacing any previous entry under this key
+            with self._cache_lock:
+                previous = self.cache.get(cache_key)
+                if previous is not None:
+                    self._track(cache_key, previous, -1)
+                self.cache[cache_key] = entry
+                self._track(cache_key, entry, 1)
+                self.version += 1
             
             logger.info(
                 f"[CONV_CACHE] Cached conversation: {cache_key} "
@@ -158,49 +245,25 @@ class ConversationCache:
             return cached.get('metadata')
         return None
 
-    def list_conversations(self) -> List[dict]:
+    def list_conversations(self, limit: int = None, offset: int = 0) -> List[dict]:
         """
-        List all cached conversations with metadata.
+        List cached conversations with metadata.
         
+        Args:
+            limit: Optional maximum number of conversations to return
+            offset: Number of newest conversations to skip
+            
         Returns:
             List of conversation summaries sorted by date (newest first)
         """
-        conversations = []
-        
-        for cache_key, data in self.cache.items():
-            metadata = data.get('metadata', {})
-            total_msgs = data.get('total_messages', {})
-            
-            # Get stages covered from agent messages
-            agent_msgs = data.get('conversation', {}).get('agent', [])
-            stages_covered = list(set(
-                m.get('stage') for m in agent_msgs if m.get('stage')
-            ))
-            
-            conversations.append({
-                'cache_key': cache_key,
-                'filename': cache_key,  # For compatibility with existing UI
-                'candidate': metadata.get('candidate_name', 'Unknown'),
-                'interview_date': metadata.get('interview_date'),
-                'room_name': metadata.get('room_name'),
-                'job_role': metadata.get('job_role', ''),
-                'experience_level': metadata.get('experience_level', ''),
-                'final_stage': metadata.get('final_stage', ''),
-                'ended_by': metadata.get('ended_by', 'unknown'),
-                'stages_covered': stages_covered,
-                'message_count': total_msgs,
-                'has_resume': metadata.get('has_resume', False),
-                'has_jd': metadata.get('has_jd', False),
-                'cached_at': data.get('cached_at', 0)
-            })
-        
-        # Sort by interview date (newest first)
-        conversations.sort(
-            key=lambda x: x.get('interview_date', '') or '',
-            reverse=True
-        )
-        
-        return conversations
+        with self._cache_lock:
+            # The date index is already ordered, so a page is a slice of it
+            stop = len(self._by_date) - offset
+            start = 0 if limit is None else max(stop - limit, 0)
+            page = self._by_date[start:max(stop, 0)]
+
+            # Rows are built on write; hand out copies so callers can annotate them
+            return [dict(self._summaries[cache_key]) for _, cache_key in reversed(page)]
 
     def update_conversation(
         self,
@@ -219,21 +282,27 @@ class ConversationCache:
         Returns:
             True if updated, False if not found
         """
-        if cache_key not in self.cache:
-            return False
-        
-        if conversation is not None:
-            self.cache[cache_key]['conversation'] = conversation
-            agent_msgs = conversation.get('agent', [])
-            user_msgs = conversation.get('user', [])
-            self.cache[cache_key]['total_messages'] = {
-                'agent': len(agent_msgs),
-                'user': len(user_msgs)
-            }
-        
-        if metadata is not None:
-            self.cache[cache_key]['metadata'].update(metadata)
-        
+        with self._cache_lock:
+            cached = self.cache.get(cache_key)
+            if cached is None:
+                return False
+
+            self._track(cache_key, cached, -1)
+
+            if conversation is not None:
+                cached['conversation'] = conversation
+                agent_msgs = conversation.get('agent', [])
+                user_msgs = conversation.get('user', [])
+                cached['total_messages'] = {
+                    'agent': len(agent_msgs),
+                    'user': len(user_msgs)
+                }
+
+            if metadata is not None:
+                cached['metadata'].update(metadata)
+
+            self._track(cache_key, cached, 1)
+            self.version += 1
         logger.info(f"[CONV_CACHE] Updated conversation: {cache_key}")
         return True
 
@@ -247,37 +316,35 @@ class ConversationCache:
         Returns:
             True if removed, False if not found
         """
-        if cache_key in self.cache:
-            del self.cache[cache_key]
-            logger.info(f"[CONV_CACHE] Removed conversation: {cache_key}")
-            return True
-        return False
+        with self._cache_lock:
+            removed = self.cache.pop(cache_key, None)
+            if removed is None:
+                return False
+            self._track(cache_key, removed, -1)
+            self.version += 1
+        logger.info(f"[CONV_CACHE] Removed conversation: {cache_key}")
+        return True
 
     def get_cache_stats(self) -> dict:
         """Get statistics about cached conversations."""
-        total_convos = len(self.cache)
-        total_messages = sum(
-            data.get('total_messages', {}).get('agent', 0) +
-            data.get('total_messages', {}).get('user', 0)
-            for data in self.cache.values()
-        )
-        
-        by_level = {}
-        for data in self.cache.values():
-            level = data.get('metadata', {}).get('experience_level', 'unknown')
-            by_level[level] = by_level.get(level, 0) + 1
-        
-        return {
-            'total_conversations': total_convos,
-            'total_messages': total_messages,
-            'by_experience_level': by_level,
-            'cache_keys': list(self.cache.keys())
-        }
+        with self._cache_lock:
+            return {
+                'total_conversations': len(self.cache),
+                'total_messages': self._total_messages,
+                'by_experience_level': dict(self._by_level),
+                'cache_keys': list(self.cache.keys())
+            }
 
     def clear_cache(self):
         """Clear all cached conversations."""
-        count = len(self.cache)
-        self.cache.clear()
+        with self._cache_lock:
+            count = len(self.cache)
+            self.cache.clear()
+            self._total_messages = 0
+            self._by_level.clear()
+            self._summaries.clear()
+            self._by_date.clear()
+            self.version += 1
         logger.info(f"[CONV_CACHE] Cache cleared ({count} conversations removed)")
 
     def export_to_dict(self, cache_key: str) -> Optional[dict]:
@@ -6,9 +6,14 @@ Privacy-first: Only stores extracted text, never raw files.
 """
 
 import os
+import codecs
 import hashlib
 import logging
+import re
+import sys
+import threading
 import time
+from collections import Counter, OrderedDict
 from typing import Optional, Dict, List, Union, BinaryIO
 from dataclasses import dataclass, field
 from pathlib import Path
@@ -16,8 +21,56 @@ import io
 
 logger = logging.getLogger(__name__)
 
+# Slotted dataclasses (no per-instance __dict__) where supported (3.10+)
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+# Cached documents kept in memory (least recently used evicted first), and how
+# long an untouched document survives; reads refresh both
+DOC_CACHE_MAX_DOCUMENTS = int(os.getenv('DOC_CACHE_MAX_DOCUMENTS', '1024'))
+DOC_CACHE_TTL_SECONDS = float(os.getenv('DOC_CACHE_TTL_SECONDS', '3600'))
+
+# Formats whose readers seek within the file, so a path input is opened
+# directly instead of being read into memory first
+_STREAMED_EXTENSIONS = ('.pdf', '.docx')
+
+
+def _open_source(source: Union[bytes, Path]) -> BinaryIO:
+    """Binary file object over a path (streamed from disk) or in-memory bytes."""
+    if isinstance(source, Path):
+        return open(source, 'rb')
+    return io.BytesIO(source)
+
+
+# Byte-order marks checked before decoding plaintext uploads
+_TEXT_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# Legacy .doc fallback: latin-1 bytes that are printable (or newline/tab) map
+# to themselves, everything else to NUL
+_DOC_PRINTABLE_TABLE = bytes(
+    c if chr(c).isprintable() or chr(c) in '\n\t' else 0 for c in range(256)
+)
+
+# Whitespace normalization for clean_text, each applied as one linear pass
+_LINE_ENDING_RE = re.compile(r'\r\n?')  # CRLF and lone CR line endings
+_HYPHEN_BREAK_RE = re.compile(r'(\w)-\n(\w)')  # Word split across lines by PDF hyphenation
+_SPACE_RUN_RE = re.compile(r'[ \t]+')
+_LINE_EDGE_WS_RE = re.compile(r'[^\S\n]*\n[^\S\n]*')  # Whitespace around a line break
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+
+# Characters encoded per hasher update when keying a document, so hashing
+# never holds a full UTF-8 copy of a large text
+DOC_HASH_CHUNK_CHARS = 1 << 18
+
+# Leading characters that, with the length, index cached texts so a
+# re-submitted document is found by comparison instead of a full re-hash
+DOC_PROBE_PREFIX_CHARS = 256
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class DocumentMetadata:
     """Metadata for cached documents."""
     filename: str
@@ -38,7 +91,17 @@ class DocumentProcessor:
 
     def __init__(self):
         """Initialize document processor with in-memory cache."""
-        self.cache: Dict[str, dict] = {}
+        self.cache: "OrderedDict[str, dict]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Raw upload content hash -> cache key, to skip re-extracting repeat uploads
+        self.content_index: Dict[str, str] = {}
+        # Reverse of content_index, so evicting an entry drops its upload hashes
+        self._content_hashes: Dict[str, set] = {}
+        # (length, leading text) -> cache key of a live entry; see cache_document
+        self._probe_index: Dict[tuple, str] = {}
+        # Stats maintained on insert/removal so get_cache_stats never rescans
+        self._total_chars = 0
+        self._by_type: Counter = Counter()
         logger.info("[DOC_PROCESSOR] Document processor initialized")
 
     def extract_text(self, file_or_path: Union[str, Path, BinaryIO], filename: str = None) -> str:
@@ -63,8 +126,11 @@ class DocumentProcessor:
                     logger.error(f"[DOC_PROCESSOR] File not found: {filepath}")
                     return ""
                     
-                with open(filepath, 'rb') as f:
-                    content = f.read()
+                if ext in _STREAMED_EXTENSIONS:
+                    content = filepath
+                else:
+                    with open(filepath, 'rb') as f:
+                        content = f.read()
             else:
                 # File-like object
                 if not filename:
@@ -98,27 +164,50 @@ class DocumentProcessor:
             logger.error(f"[DOC_PROCESSOR] Extraction error: {e}", exc_info=True)
             return f"[Error extracting text: {str(e)}]"
 
-    def _extract_pdf(self, content: bytes) -> str:
+    def _extract_pdf(self, content: Union[bytes, Path]) -> str:
+        """Extract text from PDF, with PyMuPDF when installed and PyPDF2 otherwise."""
+        try:
+            import fitz  # PyMuPDF (optional): C-backed, much faster per page
+        except ImportError:
+            return self._extract_pdf_pypdf2(content)
+
+        try:
+            if isinstance(content, Path):
+                pdf = fitz.open(str(content))
+            else:
+                pdf = fitz.open(stream=content, filetype='pdf')
+            with pdf as doc:
+                text_parts = [
+                    page_text for page in doc if (page_text := page.get_text('text'))
+                ]
+                logger.debug(f"[DOC_PROCESSOR] PDF extracted {doc.page_count} pages (PyMuPDF)")
+            return "\n\n".join(text_parts)
+        except Exception as e:
+            logger.warning(f"[DOC_PROCESSOR] PyMuPDF extraction failed, falling back to PyPDF2: {e}")
+            return self._extract_pdf_pypdf2(content)
+
+    def _extract_pdf_pypdf2(self, content: Union[bytes, Path]) -> str:
         """Extract text from PDF using PyPDF2."""
         try:
             import PyPDF2
             
-            pdf_file = io.BytesIO(content)
-            reader = PyPDF2.PdfReader(pdf_file)
-            
-            text_parts = []
-            for page_num, page in enumerate(reader.pages):
-                try:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_parts.append(page_text)
-                except Exception as e:
-                    logger.warning(f"[DOC_PROCESSOR] Error extracting page {page_num}: {e}")
-                    continue
+            # PdfReader reads a path fully into memory, but seeks an open file lazily
+            with _open_source(content) as pdf_file:
+                reader = PyPDF2.PdfReader(pdf_file)
+                
+                text_parts = []
+                for page_num, page in enumerate(reader.pages):
+                    try:
+                        page_text = page.extract_text()
+                        if page_text:
+                            text_parts.append(page_text)
+                    except Exception as e:
+                        logger.warning(f"[DOC_PROCESSOR] Error extracting page {page_num}: {e}")
+                        continue
+                
+                logger.debug(f"[DOC_PROCESSOR] PDF extracted {len(reader.pages)} pages")
             
-            text = "\n\n".join(text_parts)
-            logger.debug(f"[DOC_PROCESSOR] PDF extracted {len(reader.pages)} pages")
-            return text
+            return "\n\n".join(text_parts)
             
         except ImportError:
             logger.error("[DOC_PROCESSOR] PyPDF2 not installed. Run: pip install PyPDF2")
@@ -127,13 +216,13 @@ class DocumentProcessor:
             logger.error(f"[DOC_PROCESSOR] PDF extraction error: {e}", exc_info=True)
             return f"[PDF extraction failed: {str(e)}]"
 
-    def _extract_docx(self, content: bytes) -> str:
+    def _extract_docx(self, content: Union[bytes, Path]) -> str:
         """Extract text from DOCX using python-docx."""
         try:
             from docx import Document
             
-            docx_file = io.BytesIO(content)
-            doc = Document(docx_file)
+            with _open_source(content) as docx_file:
+                doc = Document(docx_file)
             
             text_parts = []
             
@@ -169,25 +258,14 @@ class DocumentProcessor:
         
         # Try to extract any readable text from binary
         try:
-            # Simple approach: decode as latin-1 and look for text patterns
-            text = content.decode('latin-1', errors='ignore')
+            # Simple approach: treat bytes as latin-1 and keep printable runs.
+            # Non-printable bytes become NUL separators in one C-level pass
+            runs = content.translate(_DOC_PRINTABLE_TABLE).split(b'\x00')
             
-            # Filter to printable ASCII-ish characters
-            printable_chars = []
-            word_buffer = []
-            
-            for char in text:
-                if char.isprintable() or char in '\n\t':
-                    word_buffer.append(char)
-                else:
-                    if len(word_buffer) >= 3:  # Only keep sequences of 3+ chars
-                        printable_chars.extend(word_buffer)
-                    word_buffer = []
-            
-            if word_buffer:
-                printable_chars.extend(word_buffer)
-            
-            extracted = ''.join(printable_chars)
+            # Only keep sequences of 3+ chars (the trailing run is always kept)
+            extracted = b''.join(
+                [run for run in runs[:-1] if len(run) >= 3] + runs[-1:]
+            ).decode('latin-1')
             
             if len(extracted) > 100:
                 return f"[Legacy .doc format - partial extraction]\n{extracted}"
@@ -203,17 +281,21 @@ class DocumentProcessor:
 
     def _extract_plaintext(self, content: bytes) -> str:
         """Extract text from plaintext files (MD, TXT)."""
-        # Try common encodings
-        encodings = ['utf-8', 'utf-16', 'latin-1', 'cp1252']
-        
-        for encoding in encodings:
-            try:
-                return content.decode(encoding)
-            except UnicodeDecodeError:
-                continue
-        
-        # Fallback to utf-8 with replacement
-        return content.decode('utf-8', errors='replace')
+        # A byte-order mark names the encoding, so decode once with it
+        for bom, encoding in _TEXT_BOMS:
+            if content.startswith(bom):
+                return content.decode(encoding, errors='replace')
+
+        try:
+            return content.decode('utf-8')
+        except UnicodeDecodeError:
+            pass
+
+        # Legacy Windows text; latin-1 maps every byte, including the few cp1252 leaves undefined
+        try:
+            return content.decode('cp1252')
+        except UnicodeDecodeError:
+            return content.decode('latin-1')
 
     def clean_text(self, text: str) -> str:
         """
@@ -229,29 +311,18 @@ class DocumentProcessor:
 
         # Replace common artifacts
         text = text.replace('\x00', '')  # Null bytes
-        text = text.replace('\r\n', '\n')  # Normalize line endings
-        text = text.replace('\r', '\n')
+        if '\r' in text:
+            text = _LINE_ENDING_RE.sub('\n', text)  # Normalize line endings in one pass
         
         # Fix hyphenation at line breaks (common in PDFs)
-        import re
-        text = re.sub(r'(\w)-\n(\w)', r'\1\2', text)
-        
-        # Normalize multiple newlines to max 2
-        text = re.sub(r'\n{3,}', '\n\n', text)
+        text = _HYPHEN_BREAK_RE.sub(r'\1\2', text)
         
         # Normalize multiple spaces
-        text = re.sub(r'[ \t]+', ' ', text)
-        
-        # Clean up lines
-        lines = []
-        for line in text.split('\n'):
-            stripped = line.strip()
-            if stripped:
-                lines.append(stripped)
-            elif lines and lines[-1] != '':
-                lines.append('')
+        text = _SPACE_RUN_RE.sub(' ', text)
         
-        text = '\n'.join(lines).strip()
+        # Strip every line, then keep at most one blank line between paragraphs
+        text = _LINE_EDGE_WS_RE.sub('\n', text)
+        text = _BLANK_LINES_RE.sub('\n\n', text).strip()
 
         logger.debug(f"[DOC_PROCESSOR] Cleaned text: {len(text)} characters")
         return text
@@ -259,40 +330,70 @@ class DocumentProcessor:
     def cache_document(
         self,
         text: str,
-        metadata: DocumentMetadata
+        metadata: DocumentMetadata,
+        content_hash: Optional[str] = None
     ) -> str:
         """
         Cache document with metadata for quick retrieval.
-        Uses MD5 hash as cache key for deduplication.
+        Uses a BLAKE2b hash of the text as cache key for deduplication.
 
         Args:
             text: Document text
             metadata: Document metadata
+            content_hash: Optional hash of the raw uploaded file, indexed so
+                identical re-uploads can be found via find_by_content_hash
 
         Returns:
-            Cache key (MD5 hash)
+            Cache key (32 hex chars)
         """
         if not text:
             logger.warning("[DOC_PROCESSOR] Attempted to cache empty document")
             return ""
 
-        # Generate cache key
-        key = hashlib.md5(text.encode()).hexdigest()
+        # Re-submitted text: a cached entry with the same length and opening,
+        # confirmed by comparing the full text, which is cheaper than hashing it
+        probe = (len(text), text[:DOC_PROBE_PREFIX_CHARS])
+        key = self._probe_index.get(probe)
+        cached = self._get_entry(key) if key is not None else None
+
+        if cached is None or cached['text'] != text:
+            # Generate cache key, encoding the text a slice at a time
+            hasher = hashlib.blake2b(digest_size=16)
+            for start in range(0, len(text), DOC_HASH_CHUNK_CHARS):
+                hasher.update(text[start:start + DOC_HASH_CHUNK_CHARS].encode())
+            key = hasher.hexdigest()
+            cached = self._get_entry(key)
 
         # Check if already cached
-        if key in self.cache:
+        if cached is not None:
+            if content_hash:
+                with self._cache_lock:
+                    self._index_content_locked(content_hash, key)
             logger.info(f"[DOC_PROCESSOR] Document already cached: {key}")
             return key
 
         # Update metadata with char count
         metadata.char_count = len(text)
 
-        # Store in cache
-        self.cache[key] = {
-            'text': text,
-            'metadata': metadata,
-            'text_length': len(text),
-        }
+        # Store in cache, evicting the least recently used documents
+        with self._cache_lock:
+            previous = self.cache.pop(key, None)
+            if previous is not None:
+                self._forget_locked(key, previous)
+            while len(self.cache) >= DOC_CACHE_MAX_DOCUMENTS:
+                self._forget_locked(*self.cache.popitem(last=False))
+            self.cache[key] = {
+                'text': text,
+                'metadata': metadata,
+                'text_length': len(text),
+                'accessed_at': time.monotonic(),
+                'probe': probe,
+            }
+            self._probe_index[probe] = key
+            if content_hash:
+                self._index_content_locked(content_hash, key)
+            self._total_chars += len(text)
+            self._by_type[self._document_type(metadata)] += 1
 
         logger.info(
             f"[DOC_PROCESSOR] Cached document: {key} "
@@ -301,6 +402,57 @@ class DocumentProcessor:
 
         return key
 
+    @staticmethod
+    def _document_type(metadata) -> str:
+        """Document type from DocumentMetadata or a plain metadata dict."""
+        if isinstance(metadata, DocumentMetadata):
+            return metadata.document_type
+        return metadata.get('document_type', 'unknown')
+
+    def _index_content_locked(self, content_hash: str, cache_key: str):
+        """Map an upload hash to a live entry (caller holds _cache_lock)."""
+        if cache_key not in self.cache:
+            return
+        self._unindex_content_locked(content_hash)
+        self.content_index[content_hash] = cache_key
+        self._content_hashes.setdefault(cache_key, set()).add(content_hash)
+
+    def _unindex_content_locked(self, content_hash: str):
+        """Drop an upload hash from both content indexes (caller holds _cache_lock)."""
+        old_key = self.content_index.pop(content_hash, None)
+        hashes = self._content_hashes.get(old_key)
+        if hashes is not None:
+            hashes.discard(content_hash)
+            if not hashes:
+                del self._content_hashes[old_key]
+
+    def _forget_locked(self, cache_key: str, doc: dict):
+        """Drop index and stats references to a removed entry (caller holds _cache_lock)."""
+        if self._probe_index.get(doc['probe']) == cache_key:
+            del self._probe_index[doc['probe']]
+        for content_hash in self._content_hashes.pop(cache_key, ()):
+            self.content_index.pop(content_hash, None)
+        self._total_chars -= doc['text_length']
+        doc_type = self._document_type(doc['metadata'])
+        self._by_type[doc_type] -= 1
+        if self._by_type[doc_type] <= 0:
+            del self._by_type[doc_type]
+
+    def _get_entry(self, cache_key: str) -> Optional[dict]:
+        """Return a live cache entry and refresh its recency; None if missing or expired."""
+        with self._cache_lock:
+            doc = self.cache.get(cache_key)
+            if doc is None:
+                return None
+            now = time.monotonic()
+            if now - doc['accessed_at'] > DOC_CACHE_TTL_SECONDS:
+                del self.cache[cache_key]
+                self._forget_locked(cache_key, doc)
+                return None
+            doc['accessed_at'] = now
+            self.cache.move_to_end(cache_key)
+            return doc
+
     def get_cached_document(self, cache_key: str) -> Optional[dict]:
         """
         Retrieve a cached document by key.
@@ -311,7 +463,28 @@ class DocumentProcessor:
         Returns:
             Cached document dict or None
         """
-        return self.cache.get(cache_key)
+        return self._get_entry(cache_key)
+
+    def find_by_content_hash(self, content_hash: str) -> Optional[str]:
+        """
+        Look up the cache key of a previously extracted upload.
+
+        Args:
+            content_hash: Hash of the raw uploaded file
+
+        Returns:
+            Cache key if the document is still cached, else None
+        """
+        key = self.content_index.get(content_hash)
+        if key is None:
+            return None
+        if self._get_entry(key) is None:
+            # Expiry already dropped the hash; this only covers a racing removal
+            with self._cache_lock:
+                if self.content_index.get(content_hash) == key:
+                    self._unindex_content_locked(content_hash)
+            return None
+        return key
 
     def get_cached_text(self, cache_key: str) -> str:
         """
@@ -323,11 +496,27 @@ class DocumentProcessor:
         Returns:
             Cached text or empty string
         """
-        doc = self.cache.get(cache_key)
+        doc = self._get_entry(cache_key)
         if doc:
             return doc.get('text', '')
         return ''
 
+    def get_cached_text_prefix(self, cache_key: str, max_chars: int) -> tuple:
+        """
+        Retrieve a bounded prefix of a cached document's text.
+
+        Args:
+            cache_key: The cache key from cache_document
+            max_chars: Maximum number of characters to return
+
+        Returns:
+            Tuple of (text prefix, full text length); ('', 0) if not cached
+        """
+        doc = self._get_entry(cache_key)
+        if not doc:
+            return '', 0
+        return doc['text'][:max_chars], doc['text_length']
+
     def retrieve_relevant_context(
         self,
         query: str,
@@ -348,13 +537,13 @@ class DocumentProcessor:
         Returns:
             Relevant text snippet
         """
-        if not cached_key or cached_key not in self.cache:
+        doc = self._get_entry(cached_key) if cached_key else None
+        if doc is None:
             logger.warning(
                 f"[DOC_PROCESSOR] Invalid cache key or document not found: {cached_key}"
             )
             return ""
 
-        doc = self.cache[cached_key]
         text = doc['text']
 
         # Simple implementation: Return first N characters
@@ -372,39 +561,50 @@ class DocumentProcessor:
 
     def get_cache_stats(self) -> dict:
         """Get statistics about cached documents."""
-        total_docs = len(self.cache)
-        total_chars = sum(doc['text_length'] for doc in self.cache.values())
-        
-        by_type = {}
-        for doc in self.cache.values():
-            doc_type = doc.get('metadata', {})
-            if isinstance(doc_type, DocumentMetadata):
-                doc_type = doc_type.document_type
-            else:
-                doc_type = doc_type.get('document_type', 'unknown')
-            by_type[doc_type] = by_type.get(doc_type, 0) + 1
-
-        return {
-            'total_documents': total_docs,
-            'total_characters': total_chars,
-            'by_type': by_type,
-            'cache_keys': list(self.cache.keys())
-        }
+        with self._cache_lock:
+            return {
+                'total_documents': len(self.cache),
+                'total_characters': self._total_chars,
+                'by_type': dict(self._by_type),
+                'cache_keys': list(self.cache.keys())
+            }
 
     def clear_cache(self):
         """Clear the document cache."""
-        count = len(self.cache)
-        self.cache.clear()
+        with self._cache_lock:
+            count = len(self.cache)
+            self.cache.clear()
+            self._probe_index.clear()
+            self._total_chars = 0
+            self._by_type.clear()
+            self.content_index.clear()
+            self._content_hashes.clear()
         logger.info(f"[DOC_PROCESSOR] Cache cleared ({count} documents removed)")
 
     def remove_cached(self, cache_key: str) -> bool:
         """Remove a specific document from cache."""
-        if cache_key in self.cache:
-            del self.cache[cache_key]
+        with self._cache_lock:
+            doc = self.cache.pop(cache_key, None)
+            if doc is not None:
+                self._forget_locked(cache_key, doc)
+        if doc is not None:
             logger.info(f"[DOC_PROCESSOR] Removed cached document: {cache_key}")
             return True
         return False
 
 
 # Global instance for easy access
-doc_processor = DocumentProcessor()
\ No newline at end of file
+doc_processor = DocumentProcessor()
+
+
+def extract_text_from_file(path: str) -> str:
+    """
+    Process-pool entry point for extracting text from a spooled upload.
+
+    Args:
+        path: Path to the temporary file (extension determines the extractor)
+
+    Returns:
+        Extracted and cleaned text, or a bracketed error message
+    """
+    return doc_processor.extract_text(path)
@@ -0,0 +1,28 @@
+"""
+Gunicorn configuration for MockFlow-AI.
+
+Loaded automatically by `gunicorn app:app` from the project root.
+A single process is required because agent worker subprocesses, upload jobs
+and in-memory caches live in that process; concurrency comes from threads.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', os.getenv('FLASK_PORT', '5000'))}"
+
+# Single process (see DEPLOYMENT.md), threaded for concurrent I/O-bound requests.
+# Most request time is spent waiting on OpenAI, Supabase or worker startup,
+# so threads are sized well above the CPU count.
+workers = 1
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '16'))
+
+# Token requests wait on agent worker startup (up to ~30s)
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+
+# Reuse TCP connections across requests
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '10'))
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', None)
+errorlog = '-'
+loglevel = os.getenv('LOG_LEVEL', 'info').lower()
@@ -9,15 +9,25 @@ Supports both file-based and cache-based interview retrieval.
 import json
 import logging
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Union
 from datetime import datetime
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
 # Default interviews directory
 INTERVIEWS_DIR = Path("interviews")
 
+# Max parsed interview files memoized per (path, mtime)
+INTERVIEW_MEMO_SIZE = int(os.getenv('INTERVIEW_MEMO_SIZE', '256'))
+
 # Import conversation cache (lazy import to avoid circular dependencies)
 _conversation_cache = None
 
@@ -45,6 +55,8 @@ def resequence_interview(path_or_filename: Union[str, Path]) -> Dict:
     Merges candidate partial transcripts into full turns by grouping
     adjacent user partials by timestamp gap (<=1.0s).
     Interleaves agent and merged candidate turns by timestamp.
+    File-based results are memoized by (path, mtime), so repeated loads
+    of an unchanged interview skip JSON parsing and re-merging.
     
     Args:
         path_or_filename: Cache key, path to interview JSON file, or just filename
@@ -55,82 +67,27 @@ def resequence_interview(path_or_filename: Union[str, Path]) -> Dict:
             - meta: Interview metadata
     """
     try:
-        data = None
-        source = None
-        
         # Try cache first
         cache = _get_cache()
         if cache is not None:
             cache_key = str(path_or_filename)
             cached_data = cache.export_to_dict(cache_key)
             if cached_data:
-                data = cached_data
-                source = 'cache'
                 logger.info(f"[POSTPROCESS] Loaded from cache: {cache_key}")
+                return _resequence_data(cached_data, 'cache')
         
         # Fall back to file system
-        if data is None:
-            if isinstance(path_or_filename, str):
-                path = Path(path_or_filename)
-            else:
-                path = path_or_filename
-                
-            # If just filename, look in interviews directory
-            if not path.exists() and not path.is_absolute():
-                path = INTERVIEWS_DIR / path
-                
-            if not path.exists():
-                logger.error(f"[POSTPROCESS] Interview not found: {path_or_filename}")
-                return {
-                    'error': f'Interview not found: {path_or_filename}',
-                    'ordered_conversation': [],
-                    'meta': {}
-                }
+        path = _resolve_interview_path(path_or_filename)
             
-            logger.info(f"[POSTPROCESS] Loading from file: {path}")
-            
-            with open(path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            source = 'file'
-        
-        # Extract conversation data
-        conversation = data.get('conversation', {})
-        agent_messages = conversation.get('agent', [])
-        user_messages = conversation.get('user', [])
-        
-        # Use the improved merge function that groups user messages by agent turns
-        all_turns = merge_by_agent_turns(agent_messages, user_messages)
-        
-        # Also calculate merged count using gap-based merging for metadata
-        merged_user = _merge_user_partials(user_messages, gap_threshold=5.0)
-        
-        # Get stages covered
-        stages_covered = list(set(m.get('stage') for m in agent_messages if m.get('stage')))
+        if not path.exists():
+            logger.error(f"[POSTPROCESS] Interview not found: {path_or_filename}")
+            return {
+                'error': f'Interview not found: {path_or_filename}',
+                'ordered_conversation': [],
+                'meta': {}
+            }
         
-        # Build metadata
-        meta = {
-            'candidate': data.get('candidate', 'Unknown'),
-            'interview_date': data.get('interview_date'),
-            'room_name': data.get('room_name'),
-            'job_role': data.get('job_role', ''),
-            'experience_level': data.get('experience_level', ''),
-            'total_agent_messages': len(agent_messages),
-            'total_user_messages': len(user_messages),
-            'merged_user_turns': len(merged_user),
-            'total_turns': len(all_turns),
-            'stages_covered': stages_covered,
-            'source': source,
-        }
-        
-        logger.info(
-            f"[POSTPROCESS] Resequenced interview: {len(all_turns)} turns "
-            f"({len(agent_messages)} agent, {len(merged_user)} candidate) from {source}"
-        )
-        
-        return {
-            'ordered_conversation': all_turns,
-            'meta': meta
-        }
+        return dict(_resequence_file(str(path), path.stat().st_mtime_ns))
         
     except json.JSONDecodeError as e:
         logger.error(f"[POSTPROCESS] Invalid JSON in {path_or_filename}: {e}")
@@ -148,6 +105,73 @@ def resequence_interview(path_or_filename: Union[str, Path]) -> Dict:
         }
 
 
+def _load_interview_json(path: str) -> Dict:
+    """Read an interview file as raw bytes and parse it without a text decoder."""
+    with open(path, 'rb') as f:
+        return _json_loads(f.read())
+
+
+def _resolve_interview_path(path_or_filename: Union[str, Path]) -> Path:
+    """Resolve a bare filename against INTERVIEWS_DIR."""
+    path = Path(path_or_filename)
+    
+    # If just filename, look in interviews directory
+    if not path.exists() and not path.is_absolute():
+        path = INTERVIEWS_DIR / path
+    return path
+
+
+@lru_cache(maxsize=INTERVIEW_MEMO_SIZE)
+def _resequence_file(path: str, mtime_ns: int) -> Dict:
+    """Load and resequence an interview file; memoized by (path, mtime)."""
+    logger.info(f"[POSTPROCESS] Loading from file: {path}")
+    
+    data = _load_interview_json(path)
+    return _resequence_data(data, 'file')
+
+
+def _resequence_data(data: Dict, source: str) -> Dict:
+    """Build the resequenced transcript and metadata from raw interview data."""
+    # Extract conversation data
+    conversation = data.get('conversation', {})
+    agent_messages = conversation.get('agent', [])
+    user_messages = conversation.get('user', [])
+    
+    # Use the improved merge function that groups user messages by agent turns
+    all_turns = merge_by_agent_turns(agent_messages, user_messages)
+    
+    # Also calculate merged count using gap-based merging for metadata
+    merged_user = _merge_user_partials(user_messages, gap_threshold=5.0)
+    
+    # Get stages covered
+    stages_covered = list(set(m.get('stage') for m in agent_messages if m.get('stage')))
+    
+    # Build metadata
+    meta = {
+        'candidate': data.get('candidate', 'Unknown'),
+        'interview_date': data.get('interview_date'),
+        'room_name': data.get('room_name'),
+        'job_role': data.get('job_role', ''),
+        'experience_level': data.get('experience_level', ''),
+        'total_agent_messages': len(agent_messages),
+        'total_user_messages': len(user_messages),
+        'merged_user_turns': len(merged_user),
+        'total_turns': len(all_turns),
+        'stages_covered': stages_covered,
+        'source': source,
+    }
+    
+    logger.info(
+        f"[POSTPROCESS] Resequenced interview: {len(all_turns)} turns "
+        f"({len(agent_messages)} agent, {len(merged_user)} candidate) from {source}"
+    )
+    
+    return {
+        'ordered_conversation': all_turns,
+        'meta': meta
+    }
+
+
 def _merge_user_partials(
     user_messages: List[Dict],
     gap_threshold: float = 5.0
@@ -279,10 +303,69 @@ def _finalize_group(messages: List[Dict]) -> Dict:
     }
 
 
+# Per-directory listing index: filename -> (mtime_ns, size, listing entry)
+_listing_index: Dict[str, Dict[str, tuple]] = {}
+
+
+def _read_listing_entry(path: str, filename: str, file_size: int) -> Dict:
+    """Parse one interview file into its listing entry."""
+    data = _load_interview_json(path)
+    
+    # Get conversation stats
+    conversation = data.get('conversation', {})
+    agent_msgs = conversation.get('agent', [])
+    
+    # Get stages covered
+    stages = list(set(m.get('stage') for m in agent_msgs if m.get('stage')))
+    
+    return {
+        'filename': filename,
+        'cache_key': filename,  # Use filename as key for file-based
+        'candidate': data.get('candidate', 'Unknown'),
+        'interview_date': data.get('interview_date'),
+        'room_name': data.get('room_name'),
+        'job_role': data.get('job_role', ''),
+        'experience_level': data.get('experience_level', ''),
+        'final_stage': data.get('final_stage', ''),
+        'ended_by': data.get('ended_by', 'unknown'),
+        'stages_covered': stages,
+        'message_count': data.get('total_messages', {}),
+        'file_size': file_size,
+        'has_resume': bool(data.get('resume_text')),
+        'has_jd': bool(data.get('job_description')),
+    }
+
+
+def interviews_signature(directory: Union[str, Path] = None) -> tuple:
+    """
+    Change marker for the interview files: (name, mtime_ns, size) per file.
+
+    Unlike the directory mtime, this also changes when a file's contents are
+    written after it was created or when a file is replaced in place.
+    """
+    dir_path = Path(directory) if directory else INTERVIEWS_DIR
+    try:
+        with os.scandir(dir_path) as entries:
+            files = []
+            for entry in entries:
+                if entry.name.startswith('.') or not entry.name.endswith('.json'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue  # Deleted between scandir and stat
+                files.append((entry.name, stat.st_mtime_ns, stat.st_size))
+    except OSError:
+        return ()
+    return tuple(sorted(files))
+
+
 def list_interviews(directory: Union[str, Path] = None) -> List[Dict]:
     """
     List all saved interview files with rich metadata.
     Combines both cached and file-based interviews.
+    Files are scanned with os.scandir and only new or modified files
+    (by mtime and size) are re-parsed; the rest come from the listing index.
     
     Args:
         directory: Directory to search (defaults to INTERVIEWS_DIR)
@@ -309,45 +392,40 @@ def list_interviews(directory: Union[str, Path] = None) -> List[Dict]:
     dir_path = Path(directory) if directory else INTERVIEWS_DIR
     
     if dir_path.exists():
-        for file_path in dir_path.glob("*.json"):
-            try:
+        dir_key = str(dir_path)
+        previous_index = _listing_index.get(dir_key, {})
+        current_index = {}
+        
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if entry.name.startswith('.') or not entry.name.endswith('.json'):
+                    continue
+                
                 # Skip if already in cache (by filename)
-                if file_path.name in seen_keys:
+                if entry.name in seen_keys:
                     continue
                     
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                # Get conversation stats
-                conversation = data.get('conversation', {})
-                agent_msgs = conversation.get('agent', [])
-                user_msgs = conversation.get('user', [])
-                
-                # Get stages covered
-                stages = list(set(m.get('stage') for m in agent_msgs if m.get('stage')))
-                
-                interviews.append({
-                    'filename': file_path.name,
-                    'cache_key': file_path.name,  # Use filename as key for file-based
-                    'candidate': data.get('candidate', 'Unknown'),
-                    'interview_date': data.get('interview_date'),
-                    'room_name': data.get('room_name'),
-                    'job_role': data.get('job_role', ''),
-                    'experience_level': data.get('experience_level', ''),
-                    'final_stage': data.get('final_stage', ''),
-                    'ended_by': data.get('ended_by', 'unknown'),
-                    'stages_covered': stages,
-                    'message_count': data.get('total_messages', {}),
-                    'file_size': file_path.stat().st_size,
-                    'has_resume': bool(data.get('resume_text')),
-                    'has_jd': bool(data.get('job_description')),
-                })
-            except Exception as e:
-                logger.warning(f"[POSTPROCESS] Error reading {file_path}: {e}")
-                interviews.append({
-                    'filename': file_path.name,
-                    'error': str(e),
-                })
+                try:
+                    stat = entry.stat()
+                    indexed = previous_index.get(entry.name)
+                    
+                    # Re-parse only files that are new or changed since the last scan
+                    if indexed and indexed[0] == stat.st_mtime_ns and indexed[1] == stat.st_size:
+                        item = indexed[2]
+                    else:
+                        item = _read_listing_entry(entry.path, entry.name, stat.st_size)
+                    
+                    current_index[entry.name] = (stat.st_mtime_ns, stat.st_size, item)
+                    interviews.append(dict(item))
+                except Exception as e:
+                    logger.warning(f"[POSTPROCESS] Error reading {entry.path}: {e}")
+                    interviews.append({
+                        'filename': entry.name,
+                        'error': str(e),
+                    })
+        
+        # Replacing the index drops entries for deleted files
+        _listing_index[dir_key] = current_index
     else:
         logger.warning(f"[POSTPROCESS] Interviews directory not found: {dir_path}")
     
@@ -365,6 +443,7 @@ def get_interview_summary(path_or_filename: Union[str, Path]) -> Dict:
     """
     Get a summary of an interview without full re-sequencing.
     Supports both cache and file-based retrieval.
+    File-based summaries are memoized by (path, mtime).
     
     Args:
         path_or_filename: Cache key or path to interview JSON file
@@ -373,64 +452,65 @@ def get_interview_summary(path_or_filename: Union[str, Path]) -> Dict:
         Summary dict with metadata and stats
     """
     try:
-        data = None
-        source = None
-        
         # Try cache first
         cache = _get_cache()
         if cache is not None:
             cache_key = str(path_or_filename)
             cached_data = cache.export_to_dict(cache_key)
             if cached_data:
-                data = cached_data
-                source = 'cache'
+                return _summarize_data(cached_data, 'cache')
         
         # Fall back to file
-        if data is None:
-            path = Path(path_or_filename)
-            if not path.exists() and not path.is_absolute():
-                path = INTERVIEWS_DIR / path
-                
-            if not path.exists():
-                return {'error': f'File not found: {path}'}
-                
-            with open(path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            source = 'file'
-            
-        conversation = data.get('conversation', {})
-        agent_msgs = conversation.get('agent', [])
-        user_msgs = conversation.get('user', [])
-        
-        # Calculate duration if timestamps available
-        all_timestamps = (
-            [m.get('timestamp', 0) for m in agent_msgs] +
-            [m.get('timestamp', 0) for m in user_msgs]
-        )
-        
-        duration = 0
-        if all_timestamps:
-            duration = max(all_timestamps) - min(all_timestamps)
+        path = _resolve_interview_path(path_or_filename)
             
-        # Get stages covered
-        stages = list(set(m.get('stage') for m in agent_msgs if m.get('stage')))
+        if not path.exists():
+            return {'error': f'File not found: {path}'}
         
-        return {
-            'candidate': data.get('candidate'),
-            'interview_date': data.get('interview_date'),
-            'room_name': data.get('room_name'),
-            'duration_seconds': duration,
-            'agent_message_count': len(agent_msgs),
-            'user_message_count': len(user_msgs),
-            'stages_covered': stages,
-            'source': source,
-        }
+        return dict(_summarize_file(str(path), path.stat().st_mtime_ns))
         
     except Exception as e:
         logger.error(f"[POSTPROCESS] Summary error: {e}", exc_info=True)
         return {'error': str(e)}
 
 
+@lru_cache(maxsize=INTERVIEW_MEMO_SIZE)
+def _summarize_file(path: str, mtime_ns: int) -> Dict:
+    """Load and summarize an interview file; memoized by (path, mtime)."""
+    data = _load_interview_json(path)
+    return _summarize_data(data, 'file')
+
+
+def _summarize_data(data: Dict, source: str) -> Dict:
+    """Build summary stats from raw interview data."""
+    conversation = data.get('conversation', {})
+    agent_msgs = conversation.get('agent', [])
+    user_msgs = conversation.get('user', [])
+    
+    # Calculate duration if timestamps available
+    all_timestamps = (
+        [m.get('timestamp', 0) for m in agent_msgs] +
+        [m.get('timestamp', 0) for m in user_msgs]
+    )
+    
+    duration = 0
+    if all_timestamps:
+        duration = max(all_timestamps) - min(all_timestamps)
+        
+    # Get stages covered
+    stages = list(set(m.get('stage') for m in agent_msgs if m.get('stage')))
+    
+    return {
+        'candidate': data.get('candidate'),
+        'interview_date': data.get('interview_date'),
+        'room_name': data.get('room_name'),
+        'duration_seconds': duration,
+        'agent_message_count': len(agent_msgs),
+        'user_message_count': len(user_msgs),
+        'stages_covered': stages,
+        'source': source,
+    }
+
+
 def format_conversation_text(resequenced: Dict) -> str:
     """
     Format a resequenced conversation as readable text.
@@ -454,16 +534,12 @@ def format_conversation_text(resequenced: Dict) -> str:
     current_stage = None
     for turn in resequenced.get('ordered_conversation', []):
         # Stage header if changed
-        if turn.get('stage') and turn['stage'] != current_stage:
-            current_stage = turn['stage']
-            lines.append(f"\n[Stage: {current_stage.upper()}]")
-            lines.append("")
-        
-        role = turn['role'].upper()
-        text = turn['text']
+        stage = turn.get('stage')
+        if stage and stage != current_stage:
+            current_stage = stage
+            lines += (f"\n[Stage: {stage.upper()}]", "")
         
-        lines.append(f"{role}: {text}")
-        lines.append("")
+        lines += (f"{turn['role'].upper()}: {turn['text']}", "")
     
     return "\n".join(lines)
 
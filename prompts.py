@@ -5,6 +5,9 @@ Centralized prompt management for the interview agent.
 All prompts are organized by stage and aspect for easy editing.
 """
 
+from functools import lru_cache
+from string import Formatter
+
 from fsm import InterviewStage
 
 
@@ -508,6 +511,21 @@ TONE GUIDELINES:
     # <CANDIDATE_PROFILE>Name, role, level</CANDIDATE_PROFILE>
     # <JOB_SUMMARY>Role requirements</JOB_SUMMARY>
     # <INTERVIEW_CHAT>Full transcript</INTERVIEW_CHAT>
+    user_template = """Please analyze this mock interview and provide detailed feedback.
+
+<CANDIDATE_PROFILE>
+{candidate_profile}
+</CANDIDATE_PROFILE>
+
+<JOB_SUMMARY>
+{job_summary}
+</JOB_SUMMARY>
+
+<INTERVIEW_CHAT>
+{interview_chat}
+</INTERVIEW_CHAT>
+
+Provide your analysis and feedback following the output format specified."""
 
 
 class FEEDBACKSCORES:
@@ -580,6 +598,91 @@ Return ONLY valid JSON following the schema specified."""
 
 
 
+class FEEDBACKFULL:
+    """
+    COMBINED SCORES + FEEDBACK
+
+    Single LLM call returning both the structured scores and the full
+    markdown report, so the transcript is only sent (and billed) once.
+    The system prompt is the POSTINTERVIEWFEEDBACK instructions plus
+    the output wrapper below.
+    """
+
+    output_wrapper = """RESPONSE ENVELOPE:
+Return a single JSON object with exactly two fields:
+- "scores": structured competency scores
+- "feedback": the complete markdown report described in OUTPUT FORMAT above, as one string
+
+SCORING GUIDELINES (for "scores"):
+- overall_score: Average of competency scores (1-5 scale, can use decimals)
+- summary_headline: One short line summarizing the interview
+- competencies: 3-5 competencies relevant to the target role, each with max_score 5
+- Each competency score: 1=Poor, 2=Below Average, 3=Average, 4=Good, 5=Excellent
+- quick_take: A few words explaining the competency score
+- top_strength: One sentence describing their best quality
+- top_improvement: One sentence describing the most impactful area to work on
+- filler_word_count: Approximate count of filler words (um, uh, like, basically, kind of)
+- answer_structure_score: 1-5 rating on how well they structured answers (STAR method usage)
+
+The scores and the report must agree with each other."""
+
+    user_template = """Please analyze this mock interview and return the scores and detailed feedback.
+
+<CANDIDATE_PROFILE>
+{candidate_profile}
+</CANDIDATE_PROFILE>
+
+<JOB_SUMMARY>
+{job_summary}
+</JOB_SUMMARY>
+
+<INTERVIEW_CHAT>
+{interview_chat}
+</INTERVIEW_CHAT>
+
+Return the JSON object following the response envelope specified."""
+
+    # Structured-output schema enforced by the API (strict mode)
+    response_schema = {
+        "type": "object",
+        "additionalProperties": False,
+        "required": ["scores", "feedback"],
+        "properties": {
+            "scores": {
+                "type": "object",
+                "additionalProperties": False,
+                "required": [
+                    "overall_score", "summary_headline", "competencies", "top_strength",
+                    "top_improvement", "filler_word_count", "answer_structure_score"
+                ],
+                "properties": {
+                    "overall_score": {"type": "number"},
+                    "summary_headline": {"type": "string"},
+                    "competencies": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "additionalProperties": False,
+                            "required": ["name", "score", "max_score", "quick_take"],
+                            "properties": {
+                                "name": {"type": "string"},
+                                "score": {"type": "integer"},
+                                "max_score": {"type": "integer"},
+                                "quick_take": {"type": "string"}
+                            }
+                        }
+                    },
+                    "top_strength": {"type": "string"},
+                    "top_improvement": {"type": "string"},
+                    "filler_word_count": {"type": "integer"},
+                    "answer_structure_score": {"type": "integer"}
+                }
+            },
+            "feedback": {"type": "string"}
+        }
+    }
+
+
 
 # ==================== HELPER FUNCTIONS ====================
 
@@ -723,6 +826,7 @@ def build_personality_note(candidate_name: str, job_role: str, experience_level:
     return PERSONALITY.template.replace("[CANDIDATE_NAME]", candidate_name).replace("[JOB_ROLE]", job_role or "a technical position").replace("[EXPERIENCE_LEVEL]", experience_level or "mid-level").replace("[ROLE_CONTEXT]", role_context)
 
 
+@lru_cache(maxsize=None)
 def build_post_interview_feedback_prompt() -> str:
     """
     Build full instructions for the post-interview feedback agent.
@@ -737,3 +841,97 @@ def build_post_interview_feedback_prompt() -> str:
     ]
     return "\n".join(parts)
 
+
+def _split_template(template: str) -> tuple:
+    """Split a str.format template once into (literal, field) pairs."""
+    return tuple(
+        (literal, field) for literal, field, _, _ in Formatter().parse(template)
+    )
+
+
+def _fill_template(parts: tuple, values: dict) -> str:
+    """Join pre-split template parts with the runtime values."""
+    return "".join(
+        literal + values[field] if field else literal
+        for literal, field in parts
+    )
+
+
+_POST_INTERVIEW_FEEDBACK_PARTS = _split_template(POSTINTERVIEWFEEDBACK.user_template)
+_FEEDBACK_SCORES_PARTS = _split_template(FEEDBACKSCORES.user_template)
+_FEEDBACK_FULL_PARTS = _split_template(FEEDBACKFULL.user_template)
+
+# Built user prompts per interview context. The app memoizes the context
+# strings, so repeat calls pass the same objects and hit on their cached hash
+FEEDBACK_PROMPT_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=FEEDBACK_PROMPT_CACHE_SIZE)
+def build_post_interview_feedback_user_prompt(candidate_profile: str, job_summary: str, interview_chat: str) -> str:
+    """
+    Build the user prompt for the detailed feedback call.
+
+    Args:
+        candidate_profile: Candidate profile block
+        job_summary: Job requirements block
+        interview_chat: Formatted interview transcript
+
+    Returns:
+        POSTINTERVIEWFEEDBACK.user_template with the runtime data filled in
+    """
+    return _fill_template(_POST_INTERVIEW_FEEDBACK_PARTS, {
+        'candidate_profile': candidate_profile,
+        'job_summary': job_summary,
+        'interview_chat': interview_chat,
+    })
+
+
+@lru_cache(maxsize=FEEDBACK_PROMPT_CACHE_SIZE)
+def build_feedback_scores_prompt(candidate_profile: str, job_summary: str, interview_chat: str) -> str:
+    """
+    Build the user prompt for structured score extraction.
+
+    Args:
+        candidate_profile: Candidate profile block
+        job_summary: Job requirements block
+        interview_chat: Formatted interview transcript
+
+    Returns:
+        FEEDBACKSCORES.user_template with the runtime data filled in
+    """
+    return _fill_template(_FEEDBACK_SCORES_PARTS, {
+        'candidate_profile': candidate_profile,
+        'job_summary': job_summary,
+        'interview_chat': interview_chat,
+    })
+
+
+@lru_cache(maxsize=None)
+def build_full_feedback_prompt() -> str:
+    """
+    Build system instructions for the combined scores + feedback call.
+
+    Returns:
+        Feedback agent instructions followed by the JSON response envelope.
+    """
+    return "\n".join([build_post_interview_feedback_prompt(), FEEDBACKFULL.output_wrapper])
+
+
+@lru_cache(maxsize=FEEDBACK_PROMPT_CACHE_SIZE)
+def build_full_feedback_user_prompt(candidate_profile: str, job_summary: str, interview_chat: str) -> str:
+    """
+    Build the user prompt for the combined scores + feedback call.
+
+    Args:
+        candidate_profile: Candidate profile block
+        job_summary: Job requirements block
+        interview_chat: Formatted interview transcript
+
+    Returns:
+        FEEDBACKFULL.user_template with the runtime data filled in
+    """
+    return _fill_template(_FEEDBACK_FULL_PARTS, {
+        'candidate_profile': candidate_profile,
+        'job_summary': job_summary,
+        'interview_chat': interview_chat,
+    })
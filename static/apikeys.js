@@ -228,7 +228,11 @@ async function testKeys() {
         const result = await response.json();
 
         if (result.valid) {
-            showModal('✅ Validation Success', 'All API keys have valid formats and are ready to use!', 'success');
+            const unverified = result.unverified || [];
+            const detail = unverified.length
+                ? `Keys were accepted by their providers. ${unverified.join(', ')} could not be checked from here (URL is not a public wss:// host), so only its format was verified.`
+                : 'All API keys were accepted by their providers and are ready to use!';
+            showModal('✅ Validation Success', detail, 'success');
         } else {
             showModal('❌ Validation Failed', result.message || 'One or more keys have invalid formats', 'error');
         }
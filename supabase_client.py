@@ -9,6 +9,12 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Encrypted columns read back by get_api_keys
+_API_KEY_COLUMNS = ','.join([
+    'livekit_url_encrypted', 'livekit_key_encrypted', 'livekit_secret_encrypted',
+    'openai_key_encrypted', 'deepgram_key_encrypted'
+])
+
 class SupabaseClient:
     def __init__(self):
         url = os.getenv('SUPABASE_URL')
@@ -75,9 +81,6 @@ class SupabaseClient:
             encrypted_openai = self._encrypt(openai_key)
             encrypted_deepgram = self._encrypt(deepgram_key)
 
-            # Check if keys exist
-            existing = self.client.table('user_api_keys').select('id').eq('user_id', user_id).execute()
-
             data = {
                 'user_id': user_id,
                 'livekit_url_encrypted': encrypted_livekit_url,
@@ -88,12 +91,8 @@ class SupabaseClient:
                 'encryption_salt': 'salt_v1'
             }
 
-            if existing.data:
-                # Update existing
-                self.client.table('user_api_keys').update(data).eq('user_id', user_id).execute()
-            else:
-                # Insert new
-                self.client.table('user_api_keys').insert(data).execute()
+            # Insert or update in one round trip (user_id is UNIQUE)
+            self.client.table('user_api_keys').upsert(data, on_conflict='user_id').execute()
 
             return True
         except Exception as e:
@@ -103,7 +102,7 @@ class SupabaseClient:
     def get_api_keys(self, user_id: str) -> Optional[Dict[str, str]]:
         """Get decrypted API keys for user"""
         try:
-            response = self.client.table('user_api_keys').select('*').eq('user_id', user_id).execute()
+            response = self.client.table('user_api_keys').select(_API_KEY_COLUMNS).eq('user_id', user_id).execute()
 
             if not response.data:
                 return None